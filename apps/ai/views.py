@@ -7,10 +7,13 @@ from django.views.decorators.csrf import csrf_exempt
 
 from services.ai_google import AIGoogleService
 from services.tmdb import TMDBService
+from services.images import image_url, image_srcset
+from services.title_index import TitleIndex
 
 # An instance of our services
 ai_service = AIGoogleService()
 tmdb_service = TMDBService()
+title_index = TitleIndex(tmdb_service)
 
 class ChatPageView(TemplateView):
     """
@@ -52,11 +55,16 @@ def chat_endpoint(request):
             # If it's JSON and contains recommendations, enrich them
             if isinstance(parsed_json, dict) and 'recommendations' in parsed_json:
                 enriched_movies = []
-                for movie_suggestion in parsed_json['recommendations']:
-                    if 'tmdb_id' in movie_suggestion:
-                        movie_details = tmdb_service.get_movie_details(movie_suggestion['tmdb_id'])
-                        if movie_details:
-                            enriched_movies.append(movie_details)
+                # Validate the AI's tmdb_ids locally so we only fetch real, matching films.
+                # Once the request deadline is spent, TMDBService only answers from cache,
+                # so the user still gets the movies that could be enriched in time.
+                for tmdb_id in title_index.resolve_recommendations(parsed_json['recommendations']):
+                    movie_details = tmdb_service.get_movie_details(tmdb_id)
+                    if movie_details:
+                        # Chat cards are ~128px wide; point them at the local image proxy
+                        movie_details['poster_url'] = image_url(movie_details.get('poster_path'), 154)
+                        movie_details['poster_srcset'] = image_srcset(movie_details.get('poster_path'), (154, 342))
+                        enriched_movies.append(movie_details)
                 
                 # Return the final, enriched data
                 return JsonResponse({'recommendations': enriched_movies})
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from services.ai_google import AIGoogleService
+from services.batch_recommendations import BatchRecommendationPipeline, SEED_SIZE, SEEDS_PER_CALL
+from services.title_index import TitleIndex
+from services.tmdb import TMDBService
+
+
+class Command(BaseCommand):
+    """
+    Generates dashboard recommendations for all users in batches.
+    Meant to run periodically (e.g. nightly); users whose recent watchlist
+    has not changed since the last run are skipped unless --force is given.
+
+    Example:
+        python manage.py generate_recommendations --seeds-per-call 25
+    """
+    help = "Generates AI dashboard recommendations for many users with batched Gemini calls."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='Only this user id (repeatable).')
+        parser.add_argument('--seed-size', type=int, default=SEED_SIZE, help='Recent watchlist titles per seed.')
+        parser.add_argument('--seeds-per-call', type=int, default=SEEDS_PER_CALL, help='Distinct seeds packed into one AI call.')
+        parser.add_argument('--force', action='store_true', help='Regenerate even when a seed is unchanged.')
+
+    def handle(self, *args, **options):
+        pipeline = BatchRecommendationPipeline(
+            AIGoogleService(),
+            TitleIndex(TMDBService()),
+            seed_size=options['seed_size'],
+            seeds_per_call=options['seeds_per_call'],
+        )
+        stats = pipeline.run(user_ids=options['user_ids'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['users']} users, {stats['seeds']} distinct seeds, "
+            f"{stats['calls']} AI calls, {stats['written']} recommendations written."
+        ))
@@ -1,3 +1,17 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+class UserRecommendation(models.Model):
+    """
+    Precomputed AI recommendations for a user's dashboard.
+    Written offline by the `generate_recommendations` command, so the
+    dashboard never waits on an LLM call.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recommendation')
+    # Identifies the watchlist titles the recommendations were generated from
+    seed_key = models.CharField(max_length=255)
+    movie_ids = models.JSONField(default=list)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommendations for {self.user.username}"
@@ -0,0 +1,12 @@
+from core.queue import task
+from services.ai_google import AIGoogleService
+from services.batch_recommendations import BatchRecommendationPipeline
+from services.title_index import TitleIndex
+from services.tmdb import TMDBService
+
+
+@task(max_attempts=3, retry_delay=60)
+def refresh_recommendations(user_ids=None, force=False):
+    """Regenerates stored dashboard recommendations (all users when user_ids is None)."""
+    pipeline = BatchRecommendationPipeline(AIGoogleService(), TitleIndex(TMDBService()))
+    pipeline.run(user_ids=user_ids, force=force)
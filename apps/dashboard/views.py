@@ -1,14 +1,14 @@
-import json
-import re
 from django.shortcuts import render
 from django.views.generic import TemplateView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from services.tmdb import TMDBService
-from services.ai_google import AIGoogleService
-from movies.models import Watchlist
+from services.similarity import SimilarityService
+from services.watchlist import enrich_watchlist
+from movies.models import Movie, Watchlist
+from dashboard.models import UserRecommendation
 
 tmdb_service = TMDBService()
-ai_service = AIGoogleService()
+similarity_service = SimilarityService()
 
 def home(request):
     """
@@ -21,32 +21,22 @@ def home(request):
         trending_data = tmdb_service.get_trending_movies()
         ai_recommendations = []
         
-        # Get AI recommendations based on the latest watchlist item
-        latest_watchlist_item = Watchlist.objects.filter(user=request.user).first()
-        if latest_watchlist_item:
-            prompt = f"Based on the movie '{latest_watchlist_item.title}', suggest 5 similar movies. You must respond with only a JSON object."
-            ai_response_text = ai_service.get_conversational_response(history=[], new_prompt=prompt)
-            
-            # Clean and parse the response
-            cleaned_json_str = ai_response_text
-            if '```json' in ai_response_text:
-                match = re.search(r"```json\s*(\{.*?\})\s*```", ai_response_text, re.DOTALL)
-                if match:
-                    cleaned_json_str = match.group(1)
+        # Recommendations come from the offline batch AI job (generate_recommendations),
+        # topped up by scoring the whole watchlist against the precomputed similarity
+        # model. Both are local lookups; Gemini is never called on this path.
+        watchlist_ids = list(Watchlist.objects.filter(user=request.user).values_list('movie_id', flat=True))
+        if watchlist_ids:
+            stored = UserRecommendation.objects.filter(user=request.user).values_list('movie_ids', flat=True).first()
+            recommended_ids = [tmdb_id for tmdb_id in (stored or []) if tmdb_id not in watchlist_ids][:5]
+            if len(recommended_ids) < 5:
+                similar_ids = similarity_service.recommend_for_watchlist(watchlist_ids, k=10)
+                recommended_ids += [tmdb_id for tmdb_id in similar_ids if tmdb_id not in recommended_ids][:5 - len(recommended_ids)]
+            movies_by_id = Movie.objects.in_bulk(recommended_ids, field_name='tmdb_id')
+            ai_recommendations = [
+                movies_by_id[tmdb_id].as_tmdb_result() for tmdb_id in recommended_ids if tmdb_id in movies_by_id
+            ]
 
-            try:
-                parsed_json = json.loads(cleaned_json_str)
-                if isinstance(parsed_json, dict) and 'recommendations' in parsed_json:
-                    for movie_suggestion in parsed_json['recommendations'][:5]:
-                        if 'tmdb_id' in movie_suggestion:
-                            details = tmdb_service.get_movie_details(movie_suggestion['tmdb_id'])
-                            if details:
-                                ai_recommendations.append(details)
-            except json.JSONDecodeError:
-                # AI didn't return valid JSON, so we'll fall back gracefully
-                pass
-
-        # If no AI recommendations could be generated, show popular movies instead.
+        # If no recommendations could be generated, show popular movies instead.
         if not ai_recommendations:
             popular_data = tmdb_service.get_popular_movies()
             if popular_data and 'results' in popular_data:
@@ -66,6 +56,8 @@ def home(request):
 class WatchlistPageView(LoginRequiredMixin, ListView):
     """
     Displays the movies in the currently logged-in user's watchlist.
+    Ratings, runtimes and genres come from the local catalog in one batched
+    lookup (see services.watchlist), never from per-item TMDB calls.
     """
     model = Watchlist
     template_name = 'dashboard/watchlist.html'
@@ -77,6 +69,7 @@ class WatchlistPageView(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['watchlist_items'] = enrich_watchlist(context['watchlist_items'])
         context['page_title'] = 'My Watchlist'
         return context
 
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from services.catalog import CatalogService
+from services.tmdb import TMDBService
+
+
+class Command(BaseCommand):
+    """
+    Prepares the local catalog used by the discover page: syncs the genre list
+    from TMDB, rebuilds the (movie, genre) filter table and recomputes the
+    popularity rankings. Run it after build_title_index adds movies.
+
+    Example:
+        python manage.py build_catalog
+    """
+    help = "Rebuilds the local discover catalog (genres, filter table and popularity rankings)."
+
+    def handle(self, *args, **options):
+        catalog_service = CatalogService()
+
+        genres_data = TMDBService().get_genres()
+        if genres_data and genres_data.get('genres'):
+            synced = catalog_service.sync_genres(genres_data['genres'])
+            self.stdout.write(f"Synced {synced} genres.")
+        else:
+            self.stdout.write(self.style.WARNING("Could not fetch genres from TMDB; keeping the stored list."))
+
+        ranked = catalog_service.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Ranked {ranked} movies."))
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.models import Movie
+from services.tmdb import TMDBService
+from services.similarity import SimilarityModel, extract_features
+
+
+class Command(BaseCommand):
+    """
+    Builds the content-based similarity model served on the dashboard.
+
+    Movies come from the local catalog (see build_title_index); their keywords
+    and credits are fetched from TMDB once per build.
+
+    Example:
+        python manage.py build_similarity_model --limit 5000 --neighbors 20
+    """
+    help = "Builds the movie similarity model and its top-k neighbor tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=5000, help='Number of most popular catalog movies to include.')
+        parser.add_argument('--neighbors', type=int, default=20, help='Neighbors to precompute per movie.')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent TMDB detail requests.')
+        parser.add_argument('--output', default=settings.SIMILARITY_MODEL_PATH, help='Where to write the model file.')
+
+    def handle(self, *args, **options):
+        catalog = list(
+            Movie.objects.order_by('-popularity').values('tmdb_id', 'genre_ids', 'overview')[:options['limit']]
+        )
+        if not catalog:
+            raise CommandError("The movie catalog is empty. Run build_title_index first.")
+
+        tmdb_service = TMDBService()
+
+        def fetch(movie):
+            details = tmdb_service.get_movie_details(movie['tmdb_id'], append_to_response="keywords,credits")
+            # Fall back to the catalog's genres/overview if TMDB is unavailable for this movie
+            return movie['tmdb_id'], extract_features(details or movie)
+
+        self.stdout.write(f"Fetching features for {len(catalog)} movies...")
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            features = dict(executor.map(fetch, catalog))
+
+        model = SimilarityModel.build(features, k=options['neighbors'])
+        model.save(options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote similarity model for {len(features)} movies "
+            f"({model.matrix.shape[1]} features) to {options['output']}."
+        ))
@@ -0,0 +1,75 @@
+import gzip
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.tmdb import TMDBService
+from services.title_index import TitleIndex
+
+# Number of export lines written per bulk insert.
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Builds the local title+year -> tmdb_id index used to validate AI suggestions.
+
+    Examples:
+        python manage.py build_title_index --pages 50
+        python manage.py build_title_index --export movie_ids_10_19_2026.json.gz
+    """
+    help = "Populates the local movie title index from TMDB lists and/or a TMDB daily id export."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=10,
+            help='Number of pages to ingest from each of the popular and top-rated lists.',
+        )
+        parser.add_argument(
+            '--export', dest='export_path',
+            help='Path to a TMDB daily movie id export (gzipped JSON lines).',
+        )
+
+    def handle(self, *args, **options):
+        title_index = TitleIndex(TMDBService())
+
+        if options['export_path']:
+            total = self._ingest_export(title_index, options['export_path'])
+            self.stdout.write(f"Indexed {total} titles from the export.")
+
+        total = 0
+        for fetch in (title_index.tmdb_service.get_popular_movies, title_index.tmdb_service.get_top_rated_movies):
+            for page in range(1, options['pages'] + 1):
+                data = fetch(page=page)
+                if not data or not data.get('results'):
+                    break
+                total += title_index.record(data['results'])
+                if page >= data.get('total_pages', page):
+                    break
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} titles from TMDB lists."))
+
+    def _ingest_export(self, title_index: TitleIndex, path: str) -> int:
+        """
+        Reads the export line by line; it only carries ids, original titles and
+        popularity, so it is inserted without overwriting existing rows.
+        """
+        opener = gzip.open if path.endswith('.gz') else open
+        total, chunk = 0, []
+        try:
+            with opener(path, 'rt', encoding='utf-8') as export:
+                for line in export:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    if record.get('adult') or record.get('video'):
+                        continue
+                    chunk.append(record)
+                    if len(chunk) >= CHUNK_SIZE:
+                        total += title_index.record(chunk, overwrite=False)
+                        chunk = []
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Could not read export '{path}': {e}")
+        if chunk:
+            total += title_index.record(chunk, overwrite=False)
+        return total
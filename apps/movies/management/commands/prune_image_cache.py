@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from services.images import ImageProxyService
+
+
+class Command(BaseCommand):
+    """
+    Keeps the image proxy's disk cache bounded: removes files older than
+    --max-age-days, then the oldest files until the cache fits in --max-bytes.
+    Removed variants are re-rendered on their next request.
+
+    Example:
+        python manage.py prune_image_cache --max-bytes 2147483648 --max-age-days 30
+    """
+    help = "Removes old image proxy files until the cache fits its size and age limits."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-bytes', type=int, default=settings.IMAGE_CACHE_MAX_BYTES, help='Total size to keep.')
+        parser.add_argument('--max-age-days', type=int, default=settings.IMAGE_CACHE_MAX_AGE_DAYS, help='Remove files older than this.')
+
+    def handle(self, *args, **options):
+        stats = ImageProxyService().prune(options['max_bytes'], options['max_age_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {stats['removed']} files ({stats['removed_bytes']} bytes); {stats['kept_bytes']} bytes kept."
+        ))
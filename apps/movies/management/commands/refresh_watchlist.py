@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from services.tmdb import TMDBService
+from services.watchlist import refresh_watchlist_metadata
+
+
+class Command(BaseCommand):
+    """
+    Refreshes the metadata shown on watchlist pages: movies whose catalog entry
+    is missing, has no runtime, or is older than --days are refetched from TMDB,
+    and every watchlist row's title/poster/year snapshot is rewritten in bulk.
+
+    Run it from cron, or enqueue the `movies.refresh_watchlist_metadata` task.
+
+    Example:
+        python manage.py refresh_watchlist --days 7 --limit 1000
+    """
+    help = "Refreshes watchlisted movies' metadata and the denormalized watchlist columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Refetch catalog entries older than this.')
+        parser.add_argument('--limit', type=int, default=1000, help='Maximum number of movies to fetch from TMDB.')
+
+    def handle(self, *args, **options):
+        stats = refresh_watchlist_metadata(TMDBService(), stale_after=timedelta(days=options['days']), limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Fetched {stats['fetched']} movies and updated {stats['updated']} watchlist rows."
+        ))
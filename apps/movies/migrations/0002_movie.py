@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Movie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tmdb_id', models.IntegerField(unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('original_title', models.CharField(blank=True, max_length=255)),
+                ('normalized_title', models.CharField(max_length=255)),
+                ('release_date', models.DateField(blank=True, null=True)),
+                ('release_year', models.IntegerField(blank=True, null=True)),
+                ('poster_path', models.CharField(blank=True, max_length=200, null=True)),
+                ('overview', models.TextField(blank=True)),
+                ('vote_average', models.FloatField(default=0)),
+                ('vote_count', models.IntegerField(default=0)),
+                ('popularity', models.FloatField(default=0)),
+                ('genre_ids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-popularity'],
+                'indexes': [models.Index(fields=['normalized_title', 'release_year'], name='movie_title_year_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_movie'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Genre',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovieGenre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre_id', models.IntegerField()),
+                ('release_year', models.IntegerField(blank=True, null=True)),
+                ('vote_average', models.FloatField(default=0)),
+                ('popularity', models.FloatField(default=0)),
+                ('popularity_rank', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='popularity_rank',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['release_year', 'vote_average', '-popularity'], name='movie_year_rating_pop_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['vote_average', '-popularity'], name='movie_rating_pop_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['popularity_rank'], name='movie_pop_rank_idx'),
+        ),
+        migrations.AddField(
+            model_name='moviegenre',
+            name='movie',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='genre_links', to='movies.movie'),
+        ),
+        migrations.AddIndex(
+            model_name='moviegenre',
+            index=models.Index(fields=['genre_id', 'release_year', 'vote_average', '-popularity'], name='moviegenre_filter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moviegenre',
+            index=models.Index(fields=['genre_id', 'vote_average', '-popularity'], name='moviegenre_rating_pop_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moviegenre',
+            index=models.Index(fields=['genre_id', 'popularity_rank'], name='moviegenre_rank_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='moviegenre',
+            unique_together={('movie', 'genre_id')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_catalog_discover'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='runtime',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
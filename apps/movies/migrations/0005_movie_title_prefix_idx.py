@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_movie_runtime'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['normalized_title'], name='movie_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -18,4 +18,101 @@ class Watchlist(models.Model):
         ordering = ['-added_at']
 
     def __str__(self):
-        return f"{self.title} ({self.user.username}'s Watchlist)"
\ No newline at end of file
+        return f"{self.title} ({self.user.username}'s Watchlist)"
+
+class Movie(models.Model):
+    """
+    A local snapshot of a TMDB movie record.
+    Used to resolve and validate movie titles without calling TMDB.
+    """
+    tmdb_id = models.IntegerField(unique=True)
+    title = models.CharField(max_length=255)
+    original_title = models.CharField(max_length=255, blank=True)
+    # Lowercased, accent- and punctuation-free title used as the lookup key
+    normalized_title = models.CharField(max_length=255)
+    release_date = models.DateField(null=True, blank=True)
+    release_year = models.IntegerField(null=True, blank=True)
+    poster_path = models.CharField(max_length=200, null=True, blank=True)
+    overview = models.TextField(blank=True)
+    vote_average = models.FloatField(default=0)
+    vote_count = models.IntegerField(default=0)
+    popularity = models.FloatField(default=0)
+    genre_ids = models.JSONField(default=list, blank=True)
+    # Only known once full details have been fetched (list results omit it)
+    runtime = models.IntegerField(null=True, blank=True)
+    # Position in the catalog-wide popularity ranking (1 = most popular), see build_catalog
+    popularity_rank = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-popularity']
+        indexes = [
+            models.Index(fields=['normalized_title', 'release_year'], name='movie_title_year_idx'),
+            # LIKE 'prefix%' can only use a pattern-ops index on Postgres under non-C collations
+            models.Index(fields=['normalized_title'], name='movie_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['release_year', 'vote_average', '-popularity'], name='movie_year_rating_pop_idx'),
+            models.Index(fields=['vote_average', '-popularity'], name='movie_rating_pop_idx'),
+            models.Index(fields=['popularity_rank'], name='movie_pop_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.release_year or 'n/a'})"
+
+    def as_tmdb_result(self):
+        """
+        Returns the movie in the shape of a TMDB list result, so it can be
+        rendered by the same templates (e.g. components/movie_card.html).
+        """
+        return {
+            'id': self.tmdb_id,
+            'title': self.title,
+            'original_title': self.original_title,
+            'poster_path': self.poster_path,
+            'release_date': self.release_date,
+            'overview': self.overview,
+            'vote_average': self.vote_average,
+            'vote_count': self.vote_count,
+            'popularity': self.popularity,
+            'genre_ids': self.genre_ids,
+            'runtime': self.runtime,
+        }
+
+
+class Genre(models.Model):
+    """
+    A TMDB movie genre. The primary key is the TMDB genre id.
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class MovieGenre(models.Model):
+    """
+    One row per (movie, genre) pair, denormalizing the columns used by the
+    discover filters so each filter combination is served by a single index.
+    Rebuilt by the `build_catalog` command.
+    """
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='genre_links')
+    genre_id = models.IntegerField()
+    release_year = models.IntegerField(null=True, blank=True)
+    vote_average = models.FloatField(default=0)
+    popularity = models.FloatField(default=0)
+    # Position in this genre's popularity ranking (1 = most popular)
+    popularity_rank = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('movie', 'genre_id')
+        indexes = [
+            models.Index(fields=['genre_id', 'release_year', 'vote_average', '-popularity'], name='moviegenre_filter_idx'),
+            models.Index(fields=['genre_id', 'vote_average', '-popularity'], name='moviegenre_rating_pop_idx'),
+            models.Index(fields=['genre_id', 'popularity_rank'], name='moviegenre_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.movie_id} / genre {self.genre_id}"
@@ -0,0 +1,39 @@
+from core.queue import task
+from services import watchlist
+from services.catalog import CatalogService
+from services.title_index import TitleIndex
+from services.tmdb import TMDBService
+
+
+@task(priority=-5)
+def warm_movie_details(movie_ids):
+    """Loads movie details into the TMDB cache ahead of the first page view."""
+    tmdb_service = TMDBService()
+    for movie_id in movie_ids:
+        tmdb_service.get_movie_details(movie_id)
+
+
+@task(priority=-10, max_attempts=2, retry_delay=300)
+def ingest_tmdb_lists(pages=10):
+    """
+    Pulls the popular, top-rated and trending lists into the local catalog,
+    then rebuilds the discover rankings.
+    """
+    tmdb_service = TMDBService()
+    title_index = TitleIndex(tmdb_service)
+    for fetch in (tmdb_service.get_popular_movies, tmdb_service.get_top_rated_movies, tmdb_service.get_trending_movies):
+        for page in range(1, pages + 1):
+            data = fetch(page=page)
+            if not data or not data.get('results'):
+                break
+            title_index.record(data['results'])
+    CatalogService().rebuild()
+
+
+@task(priority=-10, max_attempts=2, retry_delay=300)
+def refresh_watchlist_metadata():
+    """
+    Refetches stale or incomplete metadata for watchlisted movies and rewrites
+    the denormalized watchlist columns. Schedule it periodically (e.g. daily).
+    """
+    watchlist.refresh_watchlist_metadata(TMDBService())
@@ -0,0 +1,36 @@
+from django import template
+
+from services.images import avif_supported, image_srcset, image_url
+
+register = template.Library()
+
+# Widths offered to the browser per use case, matched to the rendered sizes.
+WIDTH_PRESETS = {
+    'card': (154, 342, 500),
+    'poster': (342, 500, 780),
+    'profile': (92, 185),
+}
+
+
+@register.inclusion_tag('components/responsive_image.html')
+def tmdb_image(path, alt='', preset='card', sizes='100vw', css_class='', eager=False, placeholder=''):
+    """
+    Renders a TMDB image through the local image proxy as a <picture> with
+    AVIF/WebP `srcset`s (JPEG when Pillow is not installed), so the browser
+    downloads only the width it needs.
+
+    Usage:
+        {% load movie_images %}
+        {% tmdb_image movie.poster_path alt=movie.title sizes="(min-width: 768px) 25vw, 50vw" %}
+    """
+    widths = WIDTH_PRESETS[preset]
+    return {
+        'src': image_url(path, widths[-1]),
+        'avif_srcset': image_srcset(path, widths, 'avif') if avif_supported() else '',
+        'srcset': image_srcset(path, widths),
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+        'eager': eager,
+        'placeholder': placeholder,
+    }
@@ -13,9 +13,18 @@ urlpatterns = [
     # Example: /movies/trending/
     path('trending/', views.trending_movies_view, name='trending'),
     
+    # JSON listing endpoints used for infinite scroll
+    # Example: /movies/api/discover/?genre=878&cursor=...
+    path('api/discover/', views.discover_api, name='api_discover'),
+    path('api/search/', views.search_api, name='api_search'),
+    path('api/trending/', views.trending_api, name='api_trending'),
+
     # Example: /movies/27205/
     path('<int:movie_id>/', views.movie_detail_view, name='detail'),
 
+    # Example: /movies/images/w342/qJ2tW6WMUDux911r6m7haRef0WH.webp
+    path('images/w<int:width>/<slug:name>.<slug:fmt>', views.image_proxy_view, name='image'),
+
     # Watchlist actions
     path('watchlist/add/', views.add_to_watchlist, name='watchlist_add'),
     path('watchlist/<int:movie_id>/remove/', views.remove_from_watchlist, name='watchlist_remove'),
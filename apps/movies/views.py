@@ -1,20 +1,38 @@
+import base64
+import json
+import time
+from functools import partial
+from typing import Optional
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from services.tmdb import TMDBService
+from services.images import ImageProxyService, IMAGE_FORMATS, image_url, image_srcset
+from services.catalog import CatalogService
+from services.prefetch import prefetcher
+from core.queue import enqueue
 from movies.models import Watchlist
+from dashboard.models import UserRecommendation
 
 # Create your views here.
 tmdb_service = TMDBService()
+image_service = ImageProxyService()
+catalog_service = CatalogService()
 
 def discover_movies_view(request):
     """
-    Displays a filterable list of movies from TMDB's /discover endpoint.
+    Displays a filterable list of movies.
     Supports filtering by genre, year, and rating, with pagination.
+    Served from the local catalog when it has been built, otherwise from
+    TMDB's /discover endpoint.
     """
     # Fetch filter options
-    genres_data = tmdb_service.get_genres()
+    genres_data = catalog_service.get_genres() or tmdb_service.get_genres()
     all_genres = genres_data.get('genres', []) if genres_data else []
     
     # Get filter parameters from request
@@ -23,13 +41,10 @@ def discover_movies_view(request):
     selected_rating = request.GET.get('rating')
     page_number = request.GET.get('page', 1)
 
-    # Fetch discovered movies
-    movies_data = tmdb_service.discover_movies(
-        genre=selected_genre,
-        year=selected_year,
-        rating=selected_rating,
-        page=page_number
-    )
+    # Fetch discovered movies, preferring the local catalog over TMDB
+    filters = {'genre': selected_genre, 'year': selected_year, 'rating': selected_rating, 'page': page_number}
+    local_data = catalog_service.discover_movies(**filters)
+    movies_data = local_data or tmdb_service.discover_movies(**filters) or {}
 
     context = {
         'page_title': 'Discover Movies',
@@ -47,10 +62,22 @@ def discover_movies_view(request):
             'total_pages': movies_data.get('total_pages', 1),
             'has_previous': movies_data.get('page', 1) > 1,
             'has_next': movies_data.get('page', 1) < movies_data.get('total_pages', 1),
-        }
+            # The local catalog does not count rows, so the last page is unknown
+            'total_known': movies_data.get('total_results') is not None,
+        },
+        'infinite_scroll': _infinite_scroll_context('movies:api_discover', movies_data, {
+            'genre': selected_genre, 'year': selected_year, 'rating': selected_rating,
+        }),
     }
     
-    return render(request, 'pages/movie_list.html', context)
+    response = render(request, 'pages/movie_list.html', context)
+
+    # Warm the likely next clicks; local catalog pages need no upstream prefetch
+    next_page = None
+    if local_data is None and context['pagination']['has_next']:
+        next_page = partial(tmdb_service.discover_movies, **{**filters, 'page': context['pagination']['current_page'] + 1})
+    prefetcher.prefetch_listing(request, tmdb_service, context['movies'], next_page)
+    return response
 
 
 def search_view(request):
@@ -73,9 +100,17 @@ def search_view(request):
             'total_pages': movies_data.get('total_pages', 1) if movies_data else 1,
             'has_previous': movies_data.get('page', 1) > 1 if movies_data else False,
             'has_next': movies_data.get('page', 1) < movies_data.get('total_pages', 1) if movies_data else False,
-        } if movies_data else {}
+        } if movies_data else {},
+        'infinite_scroll': _infinite_scroll_context('movies:api_search', movies_data, {'query': query}),
     }
-    return render(request, 'pages/search.html', context)
+    response = render(request, 'pages/search.html', context)
+
+    if movies_data:
+        next_page = None
+        if context['pagination']['has_next']:
+            next_page = partial(tmdb_service.search_movies, query, page=context['pagination']['current_page'] + 1)
+        prefetcher.prefetch_listing(request, tmdb_service, context['movies'], next_page)
+    return response
 
 
 def trending_movies_view(request):
@@ -93,9 +128,146 @@ def trending_movies_view(request):
             'total_pages': movies_data.get('total_pages', 1),
             'has_previous': movies_data.get('page', 1) > 1,
             'has_next': movies_data.get('page', 1) < movies_data.get('total_pages', 1),
-        } if movies_data else {}
+        } if movies_data else {},
+        'infinite_scroll': _infinite_scroll_context('movies:api_trending', movies_data),
+    }
+    response = render(request, 'pages/trending.html', context)
+
+    if movies_data:
+        next_page = None
+        if context['pagination']['has_next']:
+            next_page = partial(tmdb_service.get_trending_movies, page=context['pagination']['current_page'] + 1)
+        prefetcher.prefetch_listing(request, tmdb_service, context['movies'], next_page)
+    return response
+
+
+# --- JSON listing API (infinite scroll) ---
+# Slim, projected records plus the rendered cards, with opaque cursors. These
+# endpoints skip everything a full page render needs (layout, genre list) and
+# only return the next batch of cards.
+#
+# A cursor only wraps the page number, so it is opaque to clients but not a seek
+# key: TMDB pages by number anyway, and in the local catalog only the unfiltered
+# and genre-only listings seek (by popularity rank). Year and rating filters still
+# page with OFFSET, which grows with depth.
+
+def _encode_cursor(page: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({'p': page}).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Returns the page a cursor points at. Raises ValueError for malformed cursors."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    page = json.loads(base64.urlsafe_b64decode(padded.encode()))['p']
+    if not isinstance(page, int) or page < 1:
+        raise ValueError("Invalid cursor page.")
+    return page
+
+
+def _next_cursor(movies_data) -> Optional[str]:
+    if not movies_data:
+        return None
+    page = int(movies_data.get('page', 1))
+    return _encode_cursor(page + 1) if page < movies_data.get('total_pages', 1) else None
+
+
+def _infinite_scroll_context(url_name: str, movies_data, params=None):
+    """What the infinite scroll component needs to request the page after this one."""
+    return {
+        'api_url': reverse(url_name),
+        'next_cursor': _next_cursor(movies_data),
+        'params': {key: value for key, value in (params or {}).items() if value},
+    }
+
+
+def _slim_movie(movie) -> dict:
+    """Projects a TMDB movie (or Movie.as_tmdb_result()) to the fields a card renders."""
+    release_date = movie.get('release_date')
+    return {
+        'id': movie['id'],
+        'title': movie.get('title'),
+        'year': str(release_date)[:4] if release_date else None,
+        'vote_average': round(movie.get('vote_average') or 0, 1),
+        'poster_url': image_url(movie.get('poster_path'), 500),
+        'poster_srcset': image_srcset(movie.get('poster_path'), (154, 342, 500)),
+        'detail_url': reverse('movies:detail', args=[movie['id']]),
     }
-    return render(request, 'pages/trending.html', context)
+
+
+def _listing_response(request, movies_data, next_page=None):
+    movies = movies_data.get('results', []) if movies_data else []
+    movies = [movie for movie in movies if movie.get('id')]
+    response = JsonResponse({
+        'results': [_slim_movie(movie) for movie in movies],
+        # Rendered from the same template as the page, so appended cards match it
+        'html': ''.join(
+            render_to_string('components/movie_card.html', {'movie': movie}, request) for movie in movies
+        ),
+        'next_cursor': _next_cursor(movies_data),
+    })
+    prefetcher.prefetch_listing(request, tmdb_service, movies, next_page)
+    return response
+
+
+def _page_from_cursor(request) -> int:
+    cursor = request.GET.get('cursor')
+    return _decode_cursor(cursor) if cursor else 1
+
+
+@require_GET
+def discover_api(request):
+    """
+    JSON version of `discover_movies_view`.
+    Example: /movies/api/discover/?genre=878&cursor=eyJwIjogMn0
+    """
+    try:
+        page = _page_from_cursor(request)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+    filters = {'genre': request.GET.get('genre'), 'year': request.GET.get('year'), 'rating': request.GET.get('rating')}
+    movies_data = catalog_service.discover_movies(**filters, page=page)
+    next_page = None
+    if movies_data is None:
+        movies_data = tmdb_service.discover_movies(**filters, page=page)
+        if _next_cursor(movies_data):
+            next_page = partial(tmdb_service.discover_movies, **filters, page=page + 1)
+    return _listing_response(request, movies_data, next_page)
+
+
+@require_GET
+def search_api(request):
+    """
+    JSON version of `search_view`.
+    Example: /movies/api/search/?query=inception&cursor=eyJwIjogMn0
+    """
+    query = request.GET.get('query')
+    if not query:
+        return JsonResponse({'error': 'Query is required.'}, status=400)
+    try:
+        page = _page_from_cursor(request)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+    movies_data = tmdb_service.search_movies(query, page=page)
+    next_page = partial(tmdb_service.search_movies, query, page=page + 1) if _next_cursor(movies_data) else None
+    return _listing_response(request, movies_data, next_page)
+
+
+@require_GET
+def trending_api(request):
+    """
+    JSON version of `trending_movies_view`.
+    Example: /movies/api/trending/?cursor=eyJwIjogMn0
+    """
+    try:
+        page = _page_from_cursor(request)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+    movies_data = tmdb_service.get_trending_movies(page=page)
+    next_page = partial(tmdb_service.get_trending_movies, page=page + 1) if _next_cursor(movies_data) else None
+    return _listing_response(request, movies_data, next_page)
 
 
 def movie_detail_view(request, movie_id: int):
@@ -124,6 +296,44 @@ def movie_detail_view(request, movie_id: int):
     return render(request, 'pages/movie_detail.html', context)
 
 
+@require_GET
+def image_proxy_view(request, width: int, name: str, fmt: str):
+    """
+    Serves a resized TMDB image from the local disk cache, rendering it on first request.
+    Variant URLs never change content, so they are cached by browsers for a year.
+    """
+    variant = image_service.get_variant(name, width, fmt)
+    if variant is None:
+        raise Http404("Image not available.")
+
+    content_type = IMAGE_FORMATS[fmt]["content_type"] if variant.suffix == f".{fmt}" else "image/jpeg"
+    response = FileResponse(open(variant, 'rb'), content_type=content_type)
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def _queue_recommendation_refresh(user) -> None:
+    """
+    Marks a user's dashboard picks stale, then makes sure one shared batch run is
+    queued for the current window. Every user who changes their watchlist within
+    the window is regenerated together, with their seeds packed into the same
+    Gemini calls.
+    """
+    if not Watchlist.objects.filter(user=user).exists():
+        # No seed left to regenerate from; drop the picks instead
+        UserRecommendation.objects.filter(user=user).delete()
+        return
+    UserRecommendation.objects.filter(user=user).update(seed_key='')
+    window = settings.RECOMMENDATION_BATCH_WINDOW
+    now = time.time()
+    bucket = int(now // window)
+    enqueue(
+        'dashboard.refresh_recommendations',
+        dedupe_key=f"recommendations:batch:{bucket}",
+        delay=int((bucket + 1) * window - now) + 1,
+    )
+
+
 @require_POST
 @login_required
 def add_to_watchlist(request):
@@ -141,7 +351,7 @@ def add_to_watchlist(request):
         release_year = int(release_year_str)
 
     if movie_id and title:
-        Watchlist.objects.get_or_create(
+        _, created = Watchlist.objects.get_or_create(
             user=request.user,
             movie_id=int(movie_id),
             defaults={
@@ -150,6 +360,8 @@ def add_to_watchlist(request):
                 'release_year': release_year,
             }
         )
+        if created:
+            _queue_recommendation_refresh(request.user)
     
     # Redirect back to the previous page, or home if referrer is not available
     return redirect(request.META.get('HTTP_REFERER', 'dashboard:home'))
@@ -161,6 +373,8 @@ def remove_from_watchlist(request, movie_id: int):
     """
     Removes a movie from the logged-in user's watchlist.
     """
-    Watchlist.objects.filter(user=request.user, movie_id=movie_id).delete()
+    deleted, _ = Watchlist.objects.filter(user=request.user, movie_id=movie_id).delete()
+    if deleted:
+        _queue_recommendation_refresh(request.user)
     # Redirect back to the previous page, or home if referrer is not available
     return redirect(request.META.get('HTTP_REFERER', 'dashboard:home'))
\ No newline at end of file
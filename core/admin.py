@@ -1,3 +1,64 @@
 from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from .models import ProfileSample, Task
+from .profiler import top_frames
 
-# Register your models here.
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'dedupe_key')
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+
+
+@admin.register(ProfileSample)
+class ProfileSampleAdmin(admin.ModelAdmin):
+    """
+    Lists sampled request profiles, slowest first. Each sample shows its
+    hottest frames and can be downloaded as collapsed stacks for
+    flamegraph.pl or speedscope.app.
+    """
+    list_display = ('route', 'method', 'status_code', 'duration_ms', 'sample_count', 'created_at', 'download_link')
+    list_filter = ('route', 'created_at')
+    search_fields = ('route', 'path')
+    ordering = ('-duration_ms',)
+    exclude = ('collapsed_stacks',)
+    readonly_fields = (
+        'route', 'method', 'path', 'status_code', 'duration_ms', 'sample_count',
+        'created_at', 'hottest_frames', 'download_link',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path('<int:pk>/collapsed/', self.admin_site.admin_view(self.collapsed_view), name='core_profilesample_collapsed'),
+        ]
+        return urls + super().get_urls()
+
+    def collapsed_view(self, request, pk):
+        sample = get_object_or_404(ProfileSample, pk=pk)
+        response = HttpResponse(sample.collapsed_stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{sample.pk}.collapsed.txt"'
+        return response
+
+    @admin.display(description='Collapsed stacks')
+    def download_link(self, obj):
+        return format_html('<a href="{}">Download</a>', reverse('admin:core_profilesample_collapsed', args=[obj.pk]))
+
+    @admin.display(description='Hottest frames (self samples)')
+    def hottest_frames(self, obj):
+        stacks = {}
+        for line in obj.collapsed_stacks.splitlines():
+            stack, _, count = line.rpartition(' ')
+            stacks[stack] = int(count)
+        rows = format_html_join('\n', '{:>6}  {}', ((count, frame) for frame, count in top_frames(stacks)))
+        return format_html('<pre>{}</pre>', rows)
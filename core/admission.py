@@ -0,0 +1,235 @@
+"""
+Admission control: bounded concurrency per pool of routes.
+
+Each worker process holds one `AdmissionPool` per entry in ADMISSION_POOLS.
+A request takes a slot for as long as its view runs. When the pool is full,
+it waits in a short bounded queue; when the queue is full too, or the wait
+runs out, it is rejected with 503. A client that already has its per-user
+share of slots is rejected with 429 straight away, so one user's parallel
+prompts cannot fill the queue that everyone else is waiting in.
+
+`concurrency` bounds the threads a pool may occupy in one process. Pools with
+a `global_concurrency` also keep their in-flight counts in the shared cache
+(`SharedLimit`), so the per-user and global limits hold across every worker
+process. Each acquire pushes the counters' expiry `slot_ttl` seconds out, so
+they only lapse once a pool has been idle that long; slots leaked by a killed
+process heal then.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# How often a request queued on the shared limit retries for a free slot
+SHARED_POLL_INTERVAL = 0.1
+
+
+def client_key(request) -> str:
+    """
+    Identifies whose per-client limits (admission slots, prefetch budget) a
+    request counts against: the user, else the client IP. Behind a reverse
+    proxy REMOTE_ADDR is the proxy itself, so the IP is read from
+    CLIENT_IP_HEADER when set, taking the entry the trusted proxies appended
+    rather than any the client sent. Anonymous session cookies are not used,
+    since a client can drop or forge them to get a fresh key.
+    """
+    if getattr(request, 'user', None) is not None and request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{client_ip(request)}"
+
+
+def client_ip(request) -> str:
+    """The client's address: from CLIENT_IP_HEADER when configured, else REMOTE_ADDR."""
+    header = settings.CLIENT_IP_HEADER
+    if header and request.META.get(header):
+        hops = [hop.strip() for hop in request.META[header].split(',') if hop.strip()]
+        if hops:
+            return hops[-min(settings.CLIENT_IP_TRUSTED_PROXIES, len(hops))]
+    return request.META.get('REMOTE_ADDR', 'unknown')
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries the HTTP status and Retry-After seconds."""
+
+    def __init__(self, status: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class SharedLimit:
+    """
+    Per-user and global in-flight counters kept in the shared cache with
+    atomic incr/decr, plus a shared count of queued requests.
+    """
+
+    def __init__(self, name: str, concurrency: int, per_user: Optional[int], queue_size: int,
+                 retry_after: int, slot_ttl: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.per_user = per_user
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.slot_ttl = slot_ttl
+        self.global_key = f"admission:{name}:active"
+        self.waiting_key = f"admission:{name}:waiting"
+
+    def user_key(self, user_key: str) -> str:
+        return f"admission:{self.name}:user:{user_key}"
+
+    def _incr(self, key: str) -> int:
+        try:
+            value = cache.incr(key)
+        except ValueError:  # first use, or the counter expired
+            if cache.add(key, 1, self.slot_ttl):
+                return 1
+            value = cache.incr(key)
+        # incr keeps the original expiry; a busy counter must not lapse under its holders
+        cache.touch(key, self.slot_ttl)
+        return value
+
+    def _decr(self, key: str) -> None:
+        try:
+            value = cache.decr(key)
+        except ValueError:  # expired while held; nothing to give back
+            return
+        if value < 0:
+            # Holders from before an expiry released into a fresh counter
+            cache.incr(key, -value)
+
+    def acquire(self, user_key: str, max_wait: float) -> None:
+        """
+        Takes a shared slot, waiting up to `max_wait` seconds for one.
+
+        Raises:
+            AdmissionRejected: 429 if the client is at its limit, 503 if the pool stays full.
+        """
+        per_user_key = self.user_key(user_key)
+        if self.per_user is not None and self._incr(per_user_key) > self.per_user:
+            self._decr(per_user_key)
+            raise AdmissionRejected(429, self.retry_after, f"Too many concurrent requests ({self.name}).")
+
+        queued = False
+        give_up_at = time.monotonic() + max_wait
+        try:
+            while True:
+                if self._incr(self.global_key) <= self.concurrency:
+                    return
+                self._decr(self.global_key)
+                if not queued:
+                    queued = True
+                    if self._incr(self.waiting_key) > self.queue_size:
+                        raise AdmissionRejected(503, self.retry_after, f"Server busy ({self.name}).")
+                if time.monotonic() + SHARED_POLL_INTERVAL > give_up_at:
+                    raise AdmissionRejected(503, self.retry_after, f"Server busy ({self.name}).")
+                time.sleep(SHARED_POLL_INTERVAL)
+        except AdmissionRejected:
+            if self.per_user is not None:
+                self._decr(per_user_key)
+            raise
+        finally:
+            if queued:
+                self._decr(self.waiting_key)
+
+    def release(self, user_key: str) -> None:
+        self._decr(self.global_key)
+        if self.per_user is not None:
+            self._decr(self.user_key(user_key))
+
+
+class AdmissionPool:
+    """
+    A counting semaphore with a per-user cap and a bounded wait queue, backed
+    by a `SharedLimit` when `global_concurrency` is set.
+
+    Usage:
+        pool = AdmissionPool('ai', concurrency=4, per_user=1, queue_size=8, queue_timeout=3)
+        pool.acquire('user:1')  # raises AdmissionRejected
+        try:
+            ...
+        finally:
+            pool.release('user:1')
+    """
+
+    def __init__(self, name: str, concurrency: int, per_user: Optional[int] = None,
+                 queue_size: int = 0, queue_timeout: float = 0, retry_after: int = 1,
+                 global_concurrency: Optional[int] = None, slot_ttl: int = 120):
+        self.name = name
+        self.concurrency = concurrency
+        self.shared = None
+        if global_concurrency is not None:
+            # Per-user and global limits are enforced across processes; this
+            # pool only bounds the threads used in this one
+            self.shared = SharedLimit(name, global_concurrency, per_user, queue_size, retry_after, slot_ttl)
+            per_user = None
+        self.per_user = per_user
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        # Active and queued requests per client
+        self._by_user: Dict[str, int] = defaultdict(int)
+
+    def acquire(self, user_key: str, max_wait: Optional[float] = None) -> None:
+        """
+        Takes a slot, waiting up to `queue_timeout` (or `max_wait`, if shorter).
+
+        Raises:
+            AdmissionRejected: 429 if the client is at its limit, 503 if the pool stays full.
+        """
+        wait = self.queue_timeout if max_wait is None else max(min(self.queue_timeout, max_wait), 0)
+        if self.shared is not None:
+            started = time.monotonic()
+            self.shared.acquire(user_key, wait)
+            wait = max(wait - (time.monotonic() - started), 0)
+            try:
+                self._acquire_local(user_key, wait)
+            except AdmissionRejected:
+                self.shared.release(user_key)
+                raise
+        else:
+            self._acquire_local(user_key, wait)
+
+    def _acquire_local(self, user_key: str, wait: float) -> None:
+        with self._cond:
+            if self.per_user is not None and self._by_user.get(user_key, 0) >= self.per_user:
+                raise AdmissionRejected(429, self.retry_after, f"Too many concurrent requests ({self.name}).")
+
+            if self._active >= self.concurrency:
+                if self._waiting >= self.queue_size or wait <= 0:
+                    raise AdmissionRejected(503, self.retry_after, f"Server busy ({self.name}).")
+                self._waiting += 1
+                self._by_user[user_key] += 1
+                try:
+                    admitted = self._cond.wait_for(lambda: self._active < self.concurrency, timeout=wait)
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._drop_user(user_key)
+                    raise AdmissionRejected(503, self.retry_after, f"Server busy ({self.name}).")
+            else:
+                self._by_user[user_key] += 1
+            self._active += 1
+
+    def release(self, user_key: str) -> None:
+        with self._cond:
+            self._active -= 1
+            self._drop_user(user_key)
+            self._cond.notify()
+        if self.shared is not None:
+            self.shared.release(user_key)
+
+    def _drop_user(self, user_key: str) -> None:
+        self._by_user[user_key] -= 1
+        if self._by_user[user_key] <= 0:
+            del self._by_user[user_key]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._cond:
+            return {'active': self._active, 'waiting': self._waiting, 'clients': len(self._by_user)}
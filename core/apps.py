@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Connect the cached-user invalidation signals
+        from . import signals  # noqa: F401
+
+        # Register the background tasks defined in each app's tasks.py
+        autodiscover_modules('tasks')
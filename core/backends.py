@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    The default ModelBackend, with `get_user` served from the cache.
+
+    `get_user` runs on every authenticated request (via AuthenticationMiddleware),
+    so caching it removes a user SELECT per request. Entries are dropped whenever
+    the user is saved or deleted and on logout (see core/signals.py), so password
+    changes, deactivation and permission flags take effect immediately.
+
+    That only holds when every process shares the cache, so caching is off
+    unless AUTH_USER_CACHE_ENABLED (on by default with Redis); without it this
+    behaves exactly like ModelBackend.
+    """
+
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE_ENABLED:
+            return super().get_user(user_id)
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
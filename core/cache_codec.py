@@ -0,0 +1,177 @@
+"""
+Compact storage for JSON-shaped payloads in the shared cache.
+
+Values are encoded as JSON bytes (orjson when installed) instead of being
+pickled, and compressed with zstd (when installed) or zlib once they exceed
+CACHE_COMPRESS_THRESHOLD bytes. A one-byte header records the format, so
+either library can be added or removed without invalidating entries.
+
+    from core import cache_codec
+
+    key = cache_codec.versioned_key('tmdb', 2, digest)
+    cache_codec.set(key, payload, timeout=600)
+    payload = cache_codec.get(key)
+
+Bump the schema version passed to `versioned_key` whenever the shape of a
+cached payload changes; bumping CODEC_VERSION moves every namespace at once.
+With CACHE_CODEC_STATS on, bytes written before and after encoding are
+counted per process and added to shared counters in the cache in batches;
+`manage.py cache_stats` reports them.
+"""
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder produces the same bytes, slower
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; zlib is used instead
+    zstandard = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+CODEC_VERSION = 1
+# Format headers: plain JSON, zlib-compressed JSON, zstd-compressed JSON
+RAW, ZLIB, ZSTD = b'j', b'z', b's'
+STATS_PREFIX = 'cache_codec:stats'
+STATS_FIELDS = ('writes', 'compressed', 'raw_bytes', 'stored_bytes')
+# Local counts are pushed to the shared counters after this many writes or seconds
+STATS_FLUSH_WRITES = 100
+STATS_FLUSH_SECONDS = 60
+
+_pending_stats: Counter = Counter()
+_stats_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def versioned_key(namespace: str, schema_version: int, key: str) -> str:
+    """Builds a cache key that changes with both the payload schema and the codec format."""
+    return f"{namespace}:v{schema_version}.{CODEC_VERSION}:{key}"
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def encode(value: Any) -> bytes:
+    """Serializes a JSON-compatible value, compressing it if that makes it smaller."""
+    return _encode(value)[0]
+
+
+def _encode(value: Any) -> Tuple[bytes, int]:
+    raw = _dumps(value)
+    if len(raw) >= settings.CACHE_COMPRESS_THRESHOLD:
+        level = settings.CACHE_COMPRESS_LEVEL
+        if zstandard is not None:
+            packed = ZSTD + zstandard.ZstdCompressor(level=level).compress(raw)
+        else:
+            packed = ZLIB + zlib.compress(raw, level)
+        if len(packed) <= len(raw):
+            return packed, len(raw)
+    return RAW + raw, len(raw)
+
+
+def decode(blob: bytes) -> Any:
+    """Reverses `encode`. Raises ValueError for data it cannot read."""
+    header, body = blob[:1], blob[1:]
+    if header == RAW:
+        return _loads(body)
+    if header == ZLIB:
+        return _loads(zlib.decompress(body))
+    if header == ZSTD:
+        if zstandard is None:
+            raise ValueError("Entry is zstd-compressed but zstandard is not installed.")
+        return _loads(zstandard.ZstdDecompressor().decompress(body))
+    raise ValueError(f"Unknown cache codec header {header!r}.")
+
+
+def get(key: str) -> Optional[Any]:
+    """Reads and decodes a cached value; unreadable entries count as misses."""
+    blob = cache.get(key)
+    if blob is None:
+        return None
+    try:
+        return decode(blob)
+    except Exception as e:
+        logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+        cache.delete(key)
+        return None
+
+
+def set(key: str, value: Any, timeout: Optional[int] = DEFAULT_TIMEOUT) -> None:
+    """Encodes and caches a JSON-compatible value, recording the bytes saved."""
+    blob, raw_size = _encode(value)
+    cache.set(key, blob, timeout)
+    if settings.CACHE_CODEC_STATS:
+        _count(writes=1, compressed=int(blob[:1] != RAW), raw_bytes=raw_size, stored_bytes=len(blob))
+
+
+def delete(key: str) -> None:
+    cache.delete(key)
+
+
+def _count(**amounts: int) -> None:
+    """Adds to this process's counts, flushing them once enough have built up."""
+    with _stats_lock:
+        _pending_stats.update(amounts)
+        due = (_pending_stats['writes'] >= STATS_FLUSH_WRITES
+               or time.monotonic() - _last_flush >= STATS_FLUSH_SECONDS)
+    if due:
+        flush_stats()
+
+
+def flush_stats() -> None:
+    """Adds this process's pending counts to the shared counters in the cache."""
+    global _last_flush
+    with _stats_lock:
+        amounts = dict(_pending_stats)
+        _pending_stats.clear()
+        _last_flush = time.monotonic()
+    for field, amount in amounts.items():
+        if not amount:
+            continue
+        stat_key = f"{STATS_PREFIX}:{field}"
+        try:
+            cache.incr(stat_key, amount)
+        except ValueError:  # first write since the counters were reset or evicted
+            if not cache.add(stat_key, amount, None):
+                cache.incr(stat_key, amount)
+
+
+def stats() -> Dict[str, int]:
+    """
+    Returns the shared write counters. `raw_bytes` is the size of the values
+    as plain JSON, `stored_bytes` what was actually written after compression.
+    Other processes' most recent writes may not have been flushed yet.
+    """
+    flush_stats()
+    values = cache.get_many([f"{STATS_PREFIX}:{field}" for field in STATS_FIELDS])
+    result = {field: values.get(f"{STATS_PREFIX}:{field}", 0) for field in STATS_FIELDS}
+    result['saved_bytes'] = result['raw_bytes'] - result['stored_bytes']
+    return result
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _pending_stats.clear()
+    cache.delete_many([f"{STATS_PREFIX}:{field}" for field in STATS_FIELDS])
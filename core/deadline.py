@@ -0,0 +1,59 @@
+"""
+Request-scoped deadlines.
+
+`RequestDeadlineMiddleware` sets a time budget per route; services consult it
+to shrink their own timeouts, and skip upstream calls once too little time is
+left, so one slow dependency cannot hold a worker far beyond the budget.
+
+    from core import deadline
+
+    timeout = deadline.timeout_for(10)
+    if timeout is None:
+        return None  # budget exhausted, skip this call
+    requests.get(url, timeout=timeout)
+
+Work running outside a request (background threads, workers, management
+commands) has no deadline and always gets its default timeout.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# Absolute time.monotonic() value by which the current request should finish
+_deadline: ContextVar[Optional[float]] = ContextVar('request_deadline', default=None)
+
+# Calls that cannot get at least this many seconds are not worth starting.
+MIN_CALL_TIMEOUT = 0.5
+
+
+def set_deadline(seconds: float):
+    """Starts a budget of `seconds` for the current context; returns a token for `reset`."""
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def reset(token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None when there is no deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left < MIN_CALL_TIMEOUT
+
+
+def timeout_for(default: float) -> Optional[float]:
+    """
+    The timeout to use for an upstream call: `default`, shortened to the time left.
+    Returns None when the budget is exhausted and the call should be skipped.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left < MIN_CALL_TIMEOUT:
+        return None
+    return min(default, left)
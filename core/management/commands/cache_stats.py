@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core import cache_codec
+
+
+class Command(BaseCommand):
+    """
+    Reports how much space compact encoding saves in the shared cache.
+    Counters cover every process writing through core/cache_codec.py, and are
+    only collected with CACHE_CODEC_STATS enabled.
+
+    Example:
+        python manage.py cache_stats --reset
+    """
+    help = "Shows bytes written to the cache before and after compact encoding."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after reporting.')
+
+    def handle(self, *args, **options):
+        stats = cache_codec.stats()
+        ratio = stats['stored_bytes'] / stats['raw_bytes'] if stats['raw_bytes'] else 1
+        self.stdout.write(
+            f"Writes: {stats['writes']} ({stats['compressed']} compressed)\n"
+            f"JSON bytes: {stats['raw_bytes']}\n"
+            f"Stored bytes: {stats['stored_bytes']} ({ratio:.0%} of JSON)\n"
+            f"Saved bytes: {stats['saved_bytes']}"
+        )
+        if options['reset']:
+            cache_codec.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.queue import enqueue
+
+
+class Command(BaseCommand):
+    """
+    Enqueues a background task, e.g. from cron.
+
+    Example:
+        python manage.py enqueue_task movies.ingest_tmdb_lists --kwargs '{"pages": 5}' --dedupe-key ingest
+    """
+    help = "Adds a task to the background queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Registered task name, e.g. dashboard.refresh_recommendations.')
+        parser.add_argument('--kwargs', default='{}', help='Task keyword arguments as a JSON object.')
+        parser.add_argument('--priority', type=int, help='Overrides the default priority.')
+        parser.add_argument('--dedupe-key', help='Skip if a task with this key is already pending.')
+
+    def handle(self, *args, **options):
+        try:
+            kwargs = json.loads(options['kwargs'])
+            queued = enqueue(options['name'], kwargs, priority=options['priority'], dedupe_key=options['dedupe_key'])
+        except (ValueError, TypeError) as e:
+            raise CommandError(str(e))
+        if queued is None:
+            self.stdout.write("Task not queued (already pending, or ran eagerly).")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Queued {queued}."))
@@ -0,0 +1,140 @@
+import os
+import signal
+import socket
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+
+from core.queue import get_backend
+
+# Longest pause between claim attempts while the database is unreachable
+CLAIM_BACKOFF_MAX = 60
+# How often the parent process checks for worker processes that died
+CHILD_CHECK_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    """
+    Runs background tasks from the queue (see core/queue.py).
+
+    Each process claims tasks in batches and executes them on its own thread
+    pool. Use several processes for CPU-bound work and more threads for
+    I/O-bound work such as TMDB calls.
+
+    Example:
+        python manage.py run_worker --processes 2 --threads 8
+    """
+    help = "Runs a background task worker pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes.')
+        parser.add_argument('--threads', type=int, default=settings.TASK_WORKER_THREADS, help='Threads per process.')
+        parser.add_argument('--poll-interval', type=float, default=settings.TASK_POLL_INTERVAL, help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        if options['processes'] <= 1:
+            self.run_loop(options['threads'], options['poll_interval'])
+            return
+
+        context = multiprocessing.get_context('fork')
+        stopping = threading.Event()
+
+        def spawn():
+            # Children must not inherit the parent's database connections
+            connections.close_all()
+            child = context.Process(target=self.run_loop, args=(options['threads'], options['poll_interval']), daemon=True)
+            child.start()
+            return child
+
+        children = [spawn() for _ in range(options['processes'])]
+
+        def forward(signum, frame):
+            stopping.set()
+            for child in children:
+                if child.is_alive():
+                    os.kill(child.pid, signum)
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+
+        # Replace any child that exits on its own (crash, OOM kill) until told to stop
+        while not stopping.wait(CHILD_CHECK_INTERVAL):
+            for i, child in enumerate(children):
+                if not child.is_alive() and not stopping.is_set():
+                    child.join()
+                    self.stderr.write(f"Worker process {child.pid} exited with code {child.exitcode}; restarting it.")
+                    children[i] = spawn()
+        for child in children:
+            child.join()
+
+    def run_loop(self, threads: int, poll_interval: float):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        backend = get_backend()
+        stopping = threading.Event()
+        free_slots = threading.Semaphore(threads)
+        running = set()
+        running_lock = threading.Lock()
+
+        def stop(signum, frame):
+            self.stdout.write(f"[{worker_id}] Stopping after running tasks finish...")
+            stopping.set()
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def execute(claimed_task):
+            try:
+                close_old_connections()
+                backend.run(claimed_task)
+            finally:
+                with running_lock:
+                    running.discard(claimed_task.pk)
+                close_old_connections()
+                free_slots.release()
+
+        def heartbeat():
+            # Keeps long tasks locked; only tasks of a worker that died go stale
+            while not stopping.wait(settings.TASK_HEARTBEAT_INTERVAL):
+                with running_lock:
+                    task_ids = list(running)
+                try:
+                    backend.heartbeat(worker_id, task_ids)
+                except Exception as e:
+                    self.stderr.write(f"[{worker_id}] Heartbeat failed: {e}")
+                finally:
+                    close_old_connections()
+        threading.Thread(target=heartbeat, name='task-heartbeat', daemon=True).start()
+
+        self.stdout.write(f"[{worker_id}] Worker started with {threads} threads.")
+        backoff = poll_interval
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='task') as executor:
+            while not stopping.is_set():
+                # Wait for at least one free thread, then claim as many tasks as there are free threads
+                if not free_slots.acquire(timeout=poll_interval):
+                    continue
+                available = 1
+                while available < threads and free_slots.acquire(blocking=False):
+                    available += 1
+
+                try:
+                    claimed = backend.claim(worker_id, available)
+                except DatabaseError as e:
+                    # Drop the broken connection and back off until the database is back
+                    self.stderr.write(f"[{worker_id}] Claim failed, retrying in {backoff:.0f}s: {e}")
+                    close_old_connections()
+                    for _ in range(available):
+                        free_slots.release()
+                    stopping.wait(backoff)
+                    backoff = min(backoff * 2, CLAIM_BACKOFF_MAX)
+                    continue
+                backoff = poll_interval
+                with running_lock:
+                    running.update(t.pk for t in claimed)
+                for claimed_task in claimed:
+                    executor.submit(execute, claimed_task)
+                for _ in range(available - len(claimed)):
+                    free_slots.release()
+                if not claimed:
+                    stopping.wait(poll_interval)
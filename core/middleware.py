@@ -0,0 +1,151 @@
+import time
+import random
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from core import deadline
+from core.admission import AdmissionPool, AdmissionRejected, client_key
+from core.profiler import StackSampler, collapse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RequestDeadlineMiddleware:
+    """
+    Gives each request a time budget, looked up by URL name in REQUEST_DEADLINES
+    (falling back to REQUEST_DEADLINE_DEFAULT). TMDBService and AIGoogleService
+    shrink their timeouts to fit it and skip calls once it is exhausted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._deadline_token = None
+        try:
+            return self.get_response(request)
+        finally:
+            if request._deadline_token is not None:
+                deadline.reset(request._deadline_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        seconds = settings.REQUEST_DEADLINES.get(view_name, settings.REQUEST_DEADLINE_DEFAULT)
+        if seconds:
+            request._deadline_token = deadline.set_deadline(seconds)
+        return None
+
+
+class AdmissionControlMiddleware:
+    """
+    Bounds how many requests of each pool run at once, per process and (for
+    pools with a global_concurrency) across processes, so slow AI calls cannot
+    take every worker thread away from page routes. Views map
+    to pools by URL name in ADMISSION_ROUTES (falling back to
+    ADMISSION_DEFAULT_POOL; None exempts a route). Rejected requests get a 429
+    or 503 with a Retry-After header, as JSON for JSON clients.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pools = {name: AdmissionPool(name, **options) for name, options in settings.ADMISSION_POOLS.items()}
+
+    def __call__(self, request):
+        request._admission = None
+        try:
+            return self.get_response(request)
+        finally:
+            if request._admission is not None:
+                pool, user_key = request._admission
+                pool.release(user_key)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return None
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        pool_name = settings.ADMISSION_ROUTES.get(view_name, settings.ADMISSION_DEFAULT_POOL)
+        if pool_name is None:
+            return None
+
+        pool, user_key = self.pools[pool_name], client_key(request)
+        try:
+            # Queueing time counts against the request deadline, when there is one
+            pool.acquire(user_key, max_wait=deadline.remaining())
+        except AdmissionRejected as e:
+            logger.info(f"Rejected {request.path} for {user_key} with {e.status}: {e.reason} {pool.snapshot()}")
+            return self._reject(request, e)
+        request._admission = (pool, user_key)
+        return None
+
+    @staticmethod
+    def _reject(request, rejection: AdmissionRejected):
+        wants_json = 'json' in request.content_type or 'json' in request.headers.get('Accept', '')
+        if wants_json:
+            response = JsonResponse({'error': rejection.reason}, status=rejection.status)
+        else:
+            response = HttpResponse(rejection.reason, status=rejection.status, content_type='text/plain')
+        response['Retry-After'] = str(rejection.retry_after)
+        return response
+
+
+class SamplingProfilerMiddleware:
+    """
+    Profiles a random PROFILER_SAMPLE_RATE share of requests, plus any request
+    from a staff user that sends the `X-Profile: 1` header, and stores the
+    sampled stacks as a ProfileSample (browse them in the admin).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._profiler = None
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            if request._profiler is not None:
+                sampler, started = request._profiler
+                stacks = sampler.stop()
+                if response is not None:
+                    self._record(request, response, stacks, (time.perf_counter() - started) * 1000)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self._should_profile(request):
+            sampler = StackSampler(interval=settings.PROFILER_INTERVAL)
+            request._profiler = (sampler, time.perf_counter())
+            sampler.start()
+        return None
+
+    @staticmethod
+    def _should_profile(request) -> bool:
+        if request.headers.get('X-Profile') == '1':
+            user = getattr(request, 'user', None)
+            return user is not None and user.is_staff
+        return settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE
+
+    @staticmethod
+    def _record(request, response, stacks, duration_ms) -> None:
+        from core.models import ProfileSample
+
+        match = request.resolver_match
+        try:
+            ProfileSample.objects.create(
+                route=(match.view_name if match else request.path)[:200],
+                method=request.method,
+                path=request.get_full_path()[:500],
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                sample_count=sum(stacks.values()),
+                collapsed_stacks=collapse(stacks),
+            )
+            # Keep only the most recent samples
+            stale = ProfileSample.objects.order_by('-created_at').values_list('pk', flat=True)[settings.PROFILER_MAX_STORED:]
+            ProfileSample.objects.filter(pk__in=list(stale)).delete()
+        except Exception as e:
+            # Profiling must never break the request it observes
+            logger.error(f"Failed to store profile for {request.path}: {e}")
@@ -0,0 +1,71 @@
+"""
+A low-overhead sampling profiler for single requests.
+
+A background thread snapshots the request thread's Python stack every few
+milliseconds and counts identical stacks. The result is in "collapsed stack"
+format (`frame;frame;frame count` per line), which flamegraph.pl and
+https://www.speedscope.app render as flame graphs.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__') or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread (the current one by default) until stopped.
+
+    Usage:
+        sampler = StackSampler(interval=0.005)
+        sampler.start()
+        ...  # work to profile
+        stacks = sampler.stop()  # Counter of collapsed stacks
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+
+
+def collapse(stacks: Counter) -> str:
+    """Formats sampled stacks as collapsed-stack text, heaviest first."""
+    return '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+
+def top_frames(stacks: Counter, limit: int = 20):
+    """
+    Aggregates samples by leaf frame ("self" time), e.g. [("json.decoder:decode:353", 41), ...].
+    """
+    leaves = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+    return leaves.most_common(limit)
@@ -0,0 +1,187 @@
+"""
+A small database-backed background task queue.
+
+Define a task in an app's `tasks.py` (discovered automatically):
+
+    from core.queue import task
+
+    @task(priority=5, max_attempts=3)
+    def refresh_recommendations(user_ids=None):
+        ...
+
+Enqueue it from anywhere, then run `python manage.py run_worker`:
+
+    from core.queue import enqueue
+    enqueue('dashboard.refresh_recommendations', {'user_ids': [1]}, dedupe_key='recs:1')
+
+Workers claim tasks with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of
+workers can share the table without handing out the same task twice.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Registered task functions, keyed by "<app module>.<function name>"
+_registry: Dict[str, Dict[str, Any]] = {}
+
+
+def task(name: Optional[str] = None, priority: int = 0, max_attempts: int = 3, retry_delay: int = 30):
+    """
+    Registers a function as a background task.
+
+    Args:
+        name (Optional[str]): Task name; defaults to "<app>.<function>", e.g. "movies.warm_movie_details".
+        priority (int): Default priority; higher runs first.
+        max_attempts (int): Total attempts before the task is marked failed.
+        retry_delay (int): Seconds before the first retry; doubles on each further attempt.
+    """
+    def decorator(func: Callable) -> Callable:
+        task_name = name or f"{func.__module__.split('.')[-2]}.{func.__name__}"
+        _registry[task_name] = {
+            'func': func, 'priority': priority, 'max_attempts': max_attempts, 'retry_delay': retry_delay,
+        }
+        func.task_name = task_name
+        return func
+    return decorator
+
+
+def get_backend() -> "DatabaseBackend":
+    return import_string(settings.TASK_QUEUE_BACKEND)()
+
+
+def enqueue(name: str, kwargs: Optional[Dict[str, Any]] = None, priority: Optional[int] = None,
+            dedupe_key: Optional[str] = None, delay: int = 0, max_attempts: Optional[int] = None) -> Optional[Task]:
+    """
+    Schedules a task. With TASK_QUEUE_EAGER it runs immediately, in-process.
+
+    Args:
+        name (str): The registered task name.
+        kwargs (Optional[Dict[str, Any]]): JSON-serializable keyword arguments.
+        priority (Optional[int]): Overrides the task's default priority.
+        dedupe_key (Optional[str]): Drops this enqueue if a task with the same key is still queued or running.
+        delay (int): Seconds to wait before the task becomes runnable.
+        max_attempts (Optional[int]): Overrides the task's default attempt limit.
+
+    Returns:
+        Optional[Task]: The queued task, or None if it was deduplicated.
+    """
+    if name not in _registry:
+        raise ValueError(f"Unknown task '{name}'.")
+    options = _registry[name]
+
+    if settings.TASK_QUEUE_EAGER:
+        options['func'](**(kwargs or {}))
+        return None
+
+    return get_backend().push(Task(
+        name=name,
+        kwargs=kwargs or {},
+        priority=options['priority'] if priority is None else priority,
+        dedupe_key=dedupe_key,
+        max_attempts=options['max_attempts'] if max_attempts is None else max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    ))
+
+
+class DatabaseBackend:
+    """
+    Stores tasks in the `Task` table. Swap it out with the TASK_QUEUE_BACKEND
+    setting; replacements must provide push, claim, heartbeat and run.
+    """
+
+    def push(self, new_task: Task) -> Optional[Task]:
+        try:
+            with transaction.atomic():
+                new_task.save()
+        except IntegrityError:
+            if new_task.dedupe_key:
+                logger.debug(f"Task {new_task.name} with key {new_task.dedupe_key} is already pending.")
+                return None
+            raise
+        return new_task
+
+    def claim(self, worker_id: str, limit: int) -> List[Task]:
+        """
+        Atomically takes up to `limit` runnable tasks, highest priority first,
+        counting the attempt as it is claimed. Tasks left running by a crashed
+        worker are released after TASK_LOCK_TIMEOUT; one that crashed on its last
+        attempt is marked failed instead of being run again.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+        with transaction.atomic():
+            candidates = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(Q(status=Task.QUEUED, run_at__lte=now) | Q(status=Task.RUNNING, locked_at__lt=stale))
+                .order_by('-priority', 'run_at', 'id')[:limit]
+            )
+            claimed = [t for t in candidates if t.status == Task.QUEUED or t.attempts < t.max_attempts]
+            exhausted = [t for t in candidates if t not in claimed]
+            if claimed:
+                Task.objects.filter(pk__in=[t.pk for t in claimed]).update(
+                    status=Task.RUNNING, attempts=F('attempts') + 1, locked_by=worker_id, locked_at=now,
+                )
+            if exhausted:
+                Task.objects.filter(pk__in=[t.pk for t in exhausted]).update(
+                    status=Task.FAILED, locked_by='', locked_at=None, finished_at=now,
+                    last_error=f"Worker lock expired during the final attempt (after {settings.TASK_LOCK_TIMEOUT}s).",
+                )
+        for exhausted_task in exhausted:
+            exhausted_task.status = Task.FAILED
+            logger.error(f"{exhausted_task} failed permanently: its worker stopped during the final attempt.")
+        for claimed_task in claimed:
+            claimed_task.status, claimed_task.locked_by, claimed_task.locked_at = Task.RUNNING, worker_id, now
+            claimed_task.attempts += 1
+        return claimed
+
+    def heartbeat(self, worker_id: str, task_ids: List[int]) -> None:
+        """Refreshes the lock on tasks this worker is still running, so they are not handed out again."""
+        if task_ids:
+            Task.objects.filter(pk__in=task_ids, status=Task.RUNNING, locked_by=worker_id).update(locked_at=timezone.now())
+
+    def run(self, claimed_task: Task) -> None:
+        """
+        Executes a claimed task and records the outcome, scheduling a retry on
+        failure. The attempt was already counted by `claim`.
+        """
+        worker_id = claimed_task.locked_by
+        options = _registry.get(claimed_task.name)
+        try:
+            if options is None:
+                raise LookupError(f"Task '{claimed_task.name}' is not registered in this worker.")
+            options['func'](**claimed_task.kwargs)
+        except Exception:
+            claimed_task.last_error = traceback.format_exc()
+            if claimed_task.attempts < claimed_task.max_attempts and options is not None:
+                backoff = options['retry_delay'] * 2 ** (claimed_task.attempts - 1)
+                claimed_task.status = Task.QUEUED
+                claimed_task.run_at = timezone.now() + timedelta(seconds=backoff)
+                logger.warning(f"{claimed_task} failed (attempt {claimed_task.attempts}); retrying in {backoff}s.")
+            else:
+                claimed_task.status = Task.FAILED
+                claimed_task.finished_at = timezone.now()
+                logger.error(f"{claimed_task} failed permanently:\n{claimed_task.last_error}")
+        else:
+            claimed_task.status = Task.SUCCEEDED
+            claimed_task.finished_at = timezone.now()
+        claimed_task.locked_by, claimed_task.locked_at = '', None
+        # Only record the outcome if the task is still ours; if its lock expired
+        # and another worker reclaimed it, that worker's result wins.
+        updated = Task.objects.filter(pk=claimed_task.pk, status=Task.RUNNING, locked_by=worker_id).update(
+            status=claimed_task.status, run_at=claimed_task.run_at,
+            last_error=claimed_task.last_error, locked_by='', locked_at=None, finished_at=claimed_task.finished_at,
+        )
+        if not updated:
+            logger.warning(f"{claimed_task} was reclaimed by another worker; discarding this run's result.")
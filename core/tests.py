@@ -1,3 +1,245 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from core import cache_codec
+from core.admission import AdmissionPool, AdmissionRejected, client_key
+from core.middleware import AdmissionControlMiddleware
+from core.models import Task
+from core.queue import enqueue, get_backend, task
+from movies.models import Movie
+from services.title_index import TitleIndex
+
+_flaky_calls = []
+
+
+@task(name='core_tests.noop')
+def noop():
+    pass
+
+
+@task(name='core_tests.fail', max_attempts=2, retry_delay=10)
+def fail():
+    raise RuntimeError("Task failed on purpose.")
+
+
+@task(name='core_tests.flaky', max_attempts=3)
+def flaky():
+    # Succeeds on the first run only, so a second, late run can be told apart
+    _flaky_calls.append(1)
+    if len(_flaky_calls) > 1:
+        raise RuntimeError("Late run.")
+
+
+@override_settings(TASK_QUEUE_EAGER=False, TASK_LOCK_TIMEOUT=60)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.backend = get_backend()
+        _flaky_calls.clear()
+
+    def expire_locks(self):
+        Task.objects.filter(status=Task.RUNNING).update(locked_at=timezone.now() - timedelta(seconds=120))
+
+    def test_enqueue_dedupes_pending_tasks(self):
+        first = enqueue('core_tests.noop', dedupe_key='noop')
+        self.assertIsNotNone(first)
+        self.assertIsNone(enqueue('core_tests.noop', dedupe_key='noop'))
+        self.assertEqual(Task.objects.count(), 1)
+
+        # Once it has run, the key is free again
+        self.backend.run(self.backend.claim('w1', 1)[0])
+        self.assertIsNotNone(enqueue('core_tests.noop', dedupe_key='noop'))
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('core_tests.missing')
+
+    def test_claim_counts_the_attempt(self):
+        enqueue('core_tests.noop')
+        claimed = self.backend.claim('w1', 5)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claimed[0].attempts, 1)
+        self.assertEqual(Task.objects.get().attempts, 1)
+        self.assertEqual(self.backend.claim('w2', 5), [])
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        enqueue('core_tests.fail')
+        before = timezone.now()
+        self.backend.run(self.backend.claim('w1', 1)[0])
+        queued = Task.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 1))
+        self.assertGreaterEqual(queued.run_at, before + timedelta(seconds=10))
+        self.assertIn("Task failed on purpose.", queued.last_error)
+        # Not runnable until the backoff has passed
+        self.assertEqual(self.backend.claim('w1', 1), [])
+
+        Task.objects.update(run_at=timezone.now())
+        self.backend.run(self.backend.claim('w1', 1)[0])
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+        self.assertIsNotNone(failed.finished_at)
+
+    def test_reclaimed_task_keeps_new_holders_result(self):
+        enqueue('core_tests.flaky')
+        first = self.backend.claim('w1', 1)[0]
+        self.expire_locks()
+        second = self.backend.claim('w2', 1)[0]
+        self.assertEqual(second.attempts, 2)
+
+        self.backend.run(second)
+        self.backend.run(first)  # the original worker finishes late, and fails
+        finished = Task.objects.get()
+        self.assertEqual(finished.status, Task.SUCCEEDED)
+        self.assertEqual(finished.last_error, '')
+
+    def test_stale_task_on_last_attempt_is_failed(self):
+        enqueue('core_tests.noop', max_attempts=1)
+        self.backend.claim('w1', 1)
+        self.expire_locks()
+        self.assertEqual(self.backend.claim('w2', 1), [])
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.locked_by), (Task.FAILED, ''))
+
+    def test_heartbeat_keeps_lock(self):
+        enqueue('core_tests.noop')
+        claimed = self.backend.claim('w1', 1)[0]
+        self.expire_locks()
+        self.backend.heartbeat('w1', [claimed.pk])
+        self.assertEqual(self.backend.claim('w2', 1), [])
+
+
+class AdmissionPoolTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_local_pool_limits_and_releases(self):
+        pool = AdmissionPool('test', concurrency=1, per_user=1, queue_size=0)
+        pool.acquire('user:1')
+        with self.assertRaises(AdmissionRejected) as rejected:
+            pool.acquire('user:1')
+        self.assertEqual(rejected.exception.status, 429)
+        with self.assertRaises(AdmissionRejected) as rejected:
+            pool.acquire('user:2')
+        self.assertEqual(rejected.exception.status, 503)
+
+        pool.release('user:1')
+        self.assertEqual(pool.snapshot(), {'active': 0, 'waiting': 0, 'clients': 0})
+        pool.acquire('user:2')
+        pool.release('user:2')
+
+    def test_shared_pool_limits_and_releases(self):
+        pool = AdmissionPool('test-shared', concurrency=4, per_user=1, queue_size=0, global_concurrency=1)
+        other_process = AdmissionPool('test-shared', concurrency=4, per_user=1, queue_size=0, global_concurrency=1)
+        pool.acquire('user:1')
+        with self.assertRaises(AdmissionRejected) as rejected:
+            other_process.acquire('user:1')
+        self.assertEqual(rejected.exception.status, 429)
+        with self.assertRaises(AdmissionRejected) as rejected:
+            other_process.acquire('user:2')
+        self.assertEqual(rejected.exception.status, 503)
+
+        pool.release('user:1')
+        self.assertEqual(cache.get(pool.shared.global_key), 0)
+        other_process.acquire('user:2')
+        other_process.release('user:2')
+        self.assertEqual(cache.get(pool.shared.user_key('user:2')), 0)
+
+    @override_settings(ADMISSION_CONTROL_ENABLED=True, ADMISSION_POOLS={
+        'ai': {'concurrency': 1, 'per_user': 1, 'queue_size': 0, 'retry_after': 7},
+    }, ADMISSION_ROUTES={'chat:api': 'ai'}, ADMISSION_DEFAULT_POOL=None)
+    def test_middleware_rejects_with_retry_after(self):
+        middleware = AdmissionControlMiddleware(
+            lambda request: middleware.process_view(request, None, (), {}) or HttpResponse('ok'),
+        )
+
+        def request(**headers):
+            request = RequestFactory().get(reverse('chat:api'), **headers)
+            request.user = AnonymousUser()
+            request.resolver_match = resolve(request.path)
+            return request
+
+        holding = request()
+        self.assertIsNone(middleware.process_view(holding, None, (), {}))
+        response = middleware(request(HTTP_ACCEPT='application/json'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+
+        middleware.pools['ai'].release(client_key(holding))
+        self.assertEqual(middleware(request()).status_code, 200)
+        self.assertEqual(middleware.pools['ai'].snapshot()['active'], 0)
+
+    def test_client_key_uses_trusted_forwarded_ip(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2')
+        request.user = AnonymousUser()
+        self.assertEqual(client_key(request), 'ip:10.0.0.1')
+        with self.settings(CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', CLIENT_IP_TRUSTED_PROXIES=1):
+            self.assertEqual(client_key(request), 'ip:2.2.2.2')
+
+
+@override_settings(CACHE_COMPRESS_THRESHOLD=1024, CACHE_CODEC_STATS=False)
+class CacheCodecTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_small_values_are_stored_raw(self):
+        value = {'title': 'Arrival', 'year': 2016, 'genres': [878, 18], 'rating': 7.6, 'video': None}
+        blob = cache_codec.encode(value)
+        self.assertEqual(blob[:1], cache_codec.RAW)
+        self.assertEqual(cache_codec.decode(blob), value)
+
+    def test_large_values_are_compressed(self):
+        value = {'results': [{'id': i, 'title': f"Movie {i}", 'overview': 'A long overview. ' * 10} for i in range(50)]}
+        blob = cache_codec.encode(value)
+        self.assertIn(blob[:1], (cache_codec.ZLIB, cache_codec.ZSTD))
+        self.assertLess(len(blob), len(cache_codec._dumps(value)))
+        self.assertEqual(cache_codec.decode(blob), value)
+
+    def test_unknown_header_is_rejected(self):
+        with self.assertRaises(ValueError):
+            cache_codec.decode(b'x{}')
+
+    def test_get_drops_unreadable_entries(self):
+        key = cache_codec.versioned_key('test', 1, 'broken')
+        self.assertEqual(key, f"test:v1.{cache_codec.CODEC_VERSION}:broken")
+        cache.set(key, b'x{}')
+        self.assertIsNone(cache_codec.get(key))
+        self.assertIsNone(cache.get(key))
+
+        cache_codec.set(key, [1, 2, 3])
+        self.assertEqual(cache_codec.get(key), [1, 2, 3])
+
+
+class TitleIndexMatchTests(SimpleTestCase):
+    def setUp(self):
+        self.index = TitleIndex(tmdb_service=None)
+        self.candidates = [
+            Movie(tmdb_id=329865, normalized_title='arrival', release_year=2016, popularity=40),
+            Movie(tmdb_id=12345, normalized_title='arrival', release_year=1996, popularity=5),
+            Movie(tmdb_id=121, normalized_title='lord of the rings the two towers', release_year=2002, popularity=80),
+        ]
+
+    def match(self, key, year=None, tmdb_id=None):
+        return self.index._match({'title': key, 'key': key, 'year': year, 'tmdb_id': tmdb_id}, self.candidates)
+
+    def test_suggested_id_is_trusted_when_title_and_year_agree(self):
+        self.assertEqual(self.match('arrival', 1996, tmdb_id=12345), 12345)
+
+    def test_wrong_suggested_id_falls_back_to_title(self):
+        self.assertEqual(self.match('arrival', 2016, tmdb_id=121), 329865)
+
+    def test_exact_title_prefers_most_popular(self):
+        self.assertEqual(self.match('arrival'), 329865)
+
+    def test_fuzzy_title_matches(self):
+        self.assertEqual(self.match('lord of the ring the two towers', 2002), 121)
+        self.assertIsNone(self.match('two towers', 2002))
+
+    def test_year_tolerance(self):
+        self.assertEqual(self.match('arrival', 2017), 329865)
+        self.assertEqual(self.match('arrival', 1997), 12345)
+        self.assertIsNone(self.match('arrival', 2019))
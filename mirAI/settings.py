@@ -58,6 +58,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.SamplingProfilerMiddleware',
+    'core.middleware.RequestDeadlineMiddleware',
+    'core.middleware.AdmissionControlMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -98,6 +101,52 @@ DATABASES = {
 }
 
 
+# --- Cache ---
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Shared Redis cache in production; per-process memory cache for local development.
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Cached service payloads (TMDB responses) are stored as JSON bytes and
+# compressed above this size; see core/cache_codec.py.
+CACHE_COMPRESS_THRESHOLD = int(os.getenv('CACHE_COMPRESS_THRESHOLD', 1024))
+CACHE_COMPRESS_LEVEL = int(os.getenv('CACHE_COMPRESS_LEVEL', 3))
+# Counts bytes written before and after encoding, flushed to the cache in batches
+CACHE_CODEC_STATS = os.getenv('CACHE_CODEC_STATS', 'False').lower() in ('true', '1', 't')
+
+
+# --- Sessions & Authentication ---
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/#configuring-sessions
+# 'cached_db' reads sessions from the cache and only falls back to the database on a miss.
+# 'django.contrib.sessions.backends.signed_cookies' avoids server-side storage entirely.
+# Session and user caching need a cache shared by all processes: invalidating a
+# per-process memory cache would not reach the other workers.
+SHARED_CACHE = bool(os.getenv('REDIS_URL'))
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE else 'django.contrib.sessions.backends.db',
+)
+
+# Serves the logged-in user from the cache instead of a SELECT per request (core/backends.py).
+# ModelBackend stays listed so sessions created before the switch remain valid.
+AUTHENTICATION_BACKENDS = ['core.backends.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend']
+AUTH_USER_CACHE_ENABLED = os.getenv('AUTH_USER_CACHE_ENABLED', str(SHARED_CACHE)).lower() in ('true', '1', 't')
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60 * 15))
+
+
 # --- Password Validation ---
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -127,6 +176,109 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# --- Image Proxy ---
+# Resized TMDB posters are stored here and served by movies:image.
+IMAGE_CACHE_ROOT = os.getenv('IMAGE_CACHE_ROOT', os.path.join(BASE_DIR, 'media', 'images'))
+# Limits enforced by `manage.py prune_image_cache` (run it from cron)
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+IMAGE_CACHE_MAX_AGE_DAYS = int(os.getenv('IMAGE_CACHE_MAX_AGE_DAYS', 30))
+
+# --- Recommendations ---
+# Written by `manage.py build_similarity_model`, read by the dashboard.
+SIMILARITY_MODEL_PATH = os.getenv('SIMILARITY_MODEL_PATH', os.path.join(BASE_DIR, 'data', 'similarity.npz'))
+
+# --- Prefetching ---
+# After a listing page renders, the next page and the visible movies' details
+# are warmed into the cache in the background, within these budgets.
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'True').lower() in ('true', '1', 't')
+PREFETCH_MAX_WORKERS = int(os.getenv('PREFETCH_MAX_WORKERS', 4))
+PREFETCH_MAX_PENDING = int(os.getenv('PREFETCH_MAX_PENDING', 64))
+PREFETCH_PER_USER_PENDING = int(os.getenv('PREFETCH_PER_USER_PENDING', 12))
+PREFETCH_DETAILS_LIMIT = int(os.getenv('PREFETCH_DETAILS_LIMIT', 10))
+
+# --- Background Tasks ---
+# See core/queue.py. Workers are started with `manage.py run_worker`.
+TASK_QUEUE_BACKEND = 'core.queue.DatabaseBackend'
+# Run tasks inline at enqueue time instead of in a worker (handy for local development)
+TASK_QUEUE_EAGER = os.getenv('TASK_QUEUE_EAGER', 'False').lower() in ('true', '1', 't')
+TASK_WORKER_THREADS = int(os.getenv('TASK_WORKER_THREADS', 4))
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', 1.0))
+# Running tasks whose worker has been silent this long (seconds) are handed out again
+TASK_LOCK_TIMEOUT = int(os.getenv('TASK_LOCK_TIMEOUT', 60 * 15))
+# How often workers refresh the lock on tasks they are still running
+TASK_HEARTBEAT_INTERVAL = float(os.getenv('TASK_HEARTBEAT_INTERVAL', 60))
+# Watchlist changes within one window (seconds) share a single batched recommendation run
+RECOMMENDATION_BATCH_WINDOW = int(os.getenv('RECOMMENDATION_BATCH_WINDOW', 60 * 5))
+
+# --- Request Deadlines ---
+# Time budget (seconds) per URL name, consulted by the TMDB and Gemini services
+# to shrink their timeouts and skip optional calls. None disables the deadline.
+REQUEST_DEADLINE_DEFAULT = float(os.getenv('REQUEST_DEADLINE_DEFAULT', 10))
+REQUEST_DEADLINES = {
+    'dashboard:home': 6,
+    'movies:list': 8,
+    'movies:search': 8,
+    'movies:trending': 8,
+    'movies:detail': 8,
+    'chat:api': 30,
+    # The image proxy downloads large originals on a cold cache
+    'movies:image': None,
+}
+
+# --- Admission Control ---
+# Concurrency budgets (core/admission.py). AI calls hold a thread for seconds,
+# so they get a small pool of their own and page routes keep the rest of the
+# worker capacity. `concurrency` is per process; with `global_concurrency` the
+# per-user and global limits are counted in the cache across all processes
+# (use Redis, or they only span one process). A client over its per_user share
+# gets a 429; a request that finds its pool and wait queue full gets a 503.
+ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'True').lower() in ('true', '1', 't')
+ADMISSION_POOLS = {
+    'ai': {
+        'concurrency': int(os.getenv('ADMISSION_AI_CONCURRENCY', 4)),
+        'global_concurrency': int(os.getenv('ADMISSION_AI_GLOBAL_CONCURRENCY', 8)),
+        'per_user': int(os.getenv('ADMISSION_AI_PER_USER', 1)),
+        # Counters expire this long after the last acquire, so slots leaked by a killed worker heal
+        'slot_ttl': 120,
+        'queue_size': 8,
+        'queue_timeout': 3,
+        'retry_after': 5,
+    },
+    # Warm variants return at once; cold ones resize and re-encode, so a grid of
+    # them is kept from occupying every page thread
+    'images': {
+        'concurrency': int(os.getenv('ADMISSION_IMAGES_CONCURRENCY', 4)),
+        'per_user': None,
+        'queue_size': 64,
+        'queue_timeout': 5,
+        'retry_after': 2,
+    },
+    'pages': {
+        'concurrency': int(os.getenv('ADMISSION_PAGES_CONCURRENCY', 32)),
+        'per_user': None,
+        'queue_size': 64,
+        'queue_timeout': 2,
+        'retry_after': 2,
+    },
+}
+ADMISSION_ROUTES = {
+    'chat:api': 'ai',
+    'movies:image': 'images',
+}
+ADMISSION_DEFAULT_POOL = 'pages'
+# Anonymous clients are limited per IP. Behind a reverse proxy, name the header it
+# sets (as a META key, e.g. HTTP_X_FORWARDED_FOR) and how many proxies append to it;
+# otherwise every client shares the proxy's REMOTE_ADDR.
+CLIENT_IP_HEADER = os.getenv('CLIENT_IP_HEADER', '')
+CLIENT_IP_TRUSTED_PROXIES = int(os.getenv('CLIENT_IP_TRUSTED_PROXIES', 1))
+
+# --- Sampling Profiler ---
+# Share of requests to profile (0 disables random sampling). Staff users can
+# always profile a request by sending the `X-Profile: 1` header.
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0))
+PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.005))
+PROFILER_MAX_STORED = int(os.getenv('PROFILER_MAX_STORED', 500))
+
 # --- Default Primary Key Field Type ---
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
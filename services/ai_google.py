@@ -3,7 +3,8 @@ import json
 import logging
 import google.generativeai as genai
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from core import deadline
 
 # --- Setup ---
 # Load environment variables from .env file located at the project root.
@@ -16,6 +17,19 @@ logger = logging.getLogger(__name__)
 # --- Constants ---
 # Retrieve the Google AI API key from environment variables.
 GOOGLE_AI_API_KEY = os.getenv("GOOGLE_AI_API_KEY")
+AI_REQUEST_TIMEOUT = 60
+
+# Instruction for offline batch generation; many seeds are answered in one call.
+BATCH_SYSTEM_INSTRUCTION = """You are MirAI, a movie recommendation engine running as an offline batch job.
+You receive a JSON object mapping seed ids to a list of movies a user recently saved.
+For EVERY seed id, recommend movies the user is likely to enjoy next. Never recommend a movie listed in that seed.
+Respond with ONLY a JSON object mapping each seed id to an array of objects with the keys "title", "year" and "tmdb_id".
+
+EXAMPLE INPUT:
+{"s0": ["Blade Runner (1982)", "Arrival (2016)"]}
+
+EXAMPLE OUTPUT:
+{"s0": [{ "title": "Blade Runner 2049", "year": 2017, "tmdb_id": 335984 }, { "title": "Ex Machina", "year": 2014, "tmdb_id": 264660 }]}"""
 
 # --- Service Class ---
 class AIGoogleService:
@@ -54,6 +68,12 @@ JSON FORMAT EXAMPLE:
             model_name='gemini-flash-latest',
             system_instruction=system_instruction
         )
+        # A separate model for offline batch jobs, constrained to JSON output
+        self.batch_model = genai.GenerativeModel(
+            model_name='gemini-flash-latest',
+            system_instruction=BATCH_SYSTEM_INSTRUCTION,
+            generation_config={"response_mime_type": "application/json"},
+        )
 
     def get_conversational_response(self, history: list, new_prompt: str) -> str:
         """
@@ -66,14 +86,54 @@ JSON FORMAT EXAMPLE:
         Returns:
             str: The AI's response, which could be plain text or a JSON string.
         """
+        # Stay within the current request's time budget, if any
+        timeout = deadline.timeout_for(AI_REQUEST_TIMEOUT)
+        if timeout is None:
+            logger.warning("Skipping Google AI request: request deadline exceeded.")
+            return "Sorry, that took too long. Please try again in a moment."
+
         try:
             chat = self.model.start_chat(history=history)
-            response = chat.send_message(new_prompt)
+            response = chat.send_message(new_prompt, request_options={"timeout": timeout})
             return response.text
         except Exception as e:
             logger.error(f"An unexpected error occurred with Google AI API: {e}")
             return "Sorry, I'm having trouble connecting to my brain right now. Please try again in a moment."
 
+    def get_batch_recommendations(self, seeds: List[List[str]], per_seed: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Gets recommendations for many seeds with a single structured call.
+
+        Args:
+            seeds (List[List[str]]): One list of movie labels (e.g. "Arrival (2016)") per seed.
+            per_seed (int): The number of recommendations wanted for each seed.
+
+        Returns:
+            List[List[Dict[str, Any]]]: Suggestions ({"title", "year", "tmdb_id"}) for each
+                                        seed, in input order. A seed the AI skipped yields
+                                        an empty list.
+
+        Raises:
+            Exception: If the request fails or the response is not JSON, so the
+                       calling task can retry instead of storing empty results.
+        """
+        if not seeds:
+            return []
+        payload = {f"s{i}": labels for i, labels in enumerate(seeds)}
+        prompt = f"Recommend {per_seed} movies for each seed.\n{json.dumps(payload, ensure_ascii=False)}"
+        try:
+            response = self.batch_model.generate_content(prompt, request_options={"timeout": AI_REQUEST_TIMEOUT})
+            parsed = json.loads(response.text)
+        except Exception as e:
+            logger.error(f"Batch recommendation request failed for {len(seeds)} seeds: {e}")
+            raise
+
+        results = []
+        for i in range(len(seeds)):
+            suggestions = parsed.get(f"s{i}") if isinstance(parsed, dict) else None
+            results.append([item for item in suggestions if isinstance(item, dict)][:per_seed] if isinstance(suggestions, list) else [])
+        return results
+
 
 # --- Example Usage (for direct testing of this script) ---
 # if __name__ == '__main__':
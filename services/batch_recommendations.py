@@ -0,0 +1,131 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from dashboard.models import UserRecommendation
+from movies.models import Watchlist
+from services.ai_google import AIGoogleService
+from services.title_index import TitleIndex
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+# How many of a user's most recent watchlist titles make up their seed.
+SEED_SIZE = 3
+# How many distinct seeds are packed into one Gemini call.
+SEEDS_PER_CALL = 25
+RECOMMENDATIONS_PER_USER = 5
+# A seed whose suggestions resolved to nothing is stored empty and retried after this long.
+EMPTY_RETRY_AFTER = timedelta(hours=24)
+
+
+class BatchRecommendationPipeline:
+    """
+    Generates dashboard recommendations for many users offline.
+
+    Users are grouped by their seed (their most recent watchlist titles), so
+    identical seeds are only sent to the AI once, and many distinct seeds are
+    packed into each structured Gemini call. Suggestions are validated through
+    the title index before being stored per user. A seed that resolves to no
+    movies is stored with an empty list, so its users are not sent to the AI
+    again on every run; it is retried once EMPTY_RETRY_AFTER has passed.
+    """
+
+    def __init__(self, ai_service: AIGoogleService, title_index: TitleIndex,
+                 seed_size: int = SEED_SIZE, seeds_per_call: int = SEEDS_PER_CALL):
+        self.ai_service = ai_service
+        self.title_index = title_index
+        self.seed_size = seed_size
+        self.seeds_per_call = seeds_per_call
+
+    def build_seeds(self, user_ids: Optional[Iterable[int]] = None) -> Dict[Tuple[int, ...], Dict]:
+        """
+        Groups users by seed with a single watchlist query.
+
+        Returns:
+            Dict[Tuple[int, ...], Dict]: seed (tuple of tmdb_ids) -> {"labels": [...], "user_ids": [...]}
+        """
+        rows = Watchlist.objects.order_by('user_id', '-added_at').values_list('user_id', 'movie_id', 'title', 'release_year')
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=list(user_ids))
+
+        recent: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+        for user_id, movie_id, title, release_year in rows.iterator():
+            if len(recent[user_id]) < self.seed_size:
+                recent[user_id].append((movie_id, f"{title} ({release_year})" if release_year else title))
+
+        seeds: Dict[Tuple[int, ...], Dict] = {}
+        for user_id, items in recent.items():
+            # Sorted, so the same titles saved in a different order share a seed
+            items = sorted(items)
+            key = tuple(movie_id for movie_id, _ in items)
+            group = seeds.setdefault(key, {"labels": [label for _, label in items], "user_ids": []})
+            group["user_ids"].append(user_id)
+        return seeds
+
+    @staticmethod
+    def seed_key(seed: Tuple[int, ...]) -> str:
+        return ",".join(str(movie_id) for movie_id in seed)
+
+    def run(self, user_ids: Optional[Iterable[int]] = None, force: bool = False) -> Dict[str, int]:
+        """
+        Runs the pipeline and stores one `UserRecommendation` per user.
+
+        Args:
+            user_ids (Optional[Iterable[int]]): Limit the run to these users.
+            force (bool): Regenerate even if a user's stored seed has not changed.
+
+        Returns:
+            Dict[str, int]: Counters for users, distinct seeds, AI calls and rows written.
+
+        Raises:
+            Exception: If an AI call fails. Batches before it are already stored,
+                       so a retry only sends the seeds that are still pending.
+        """
+        seeds = self.build_seeds(user_ids)
+        stats = {"users": sum(len(g["user_ids"]) for g in seeds.values()), "seeds": len(seeds), "calls": 0, "written": 0}
+
+        if not force:
+            # Skip seeds whose users all already have recommendations for that exact
+            # seed, unless those came back empty long enough ago to try again
+            retry_before = timezone.now() - EMPTY_RETRY_AFTER
+            current = {
+                user_id: seed_key if movie_ids or generated_at >= retry_before else None
+                for user_id, seed_key, movie_ids, generated_at in UserRecommendation.objects.values_list(
+                    'user_id', 'seed_key', 'movie_ids', 'generated_at',
+                )
+            }
+            seeds = {
+                seed: group for seed, group in seeds.items()
+                if any(current.get(user_id) != self.seed_key(seed) for user_id in group["user_ids"])
+            }
+
+        pending = list(seeds.items())
+        for start in range(0, len(pending), self.seeds_per_call):
+            chunk = pending[start:start + self.seeds_per_call]
+            suggestions = self.ai_service.get_batch_recommendations(
+                [group["labels"] for _, group in chunk], per_seed=RECOMMENDATIONS_PER_USER + self.seed_size,
+            )
+            stats["calls"] += 1
+
+            records = []
+            for (seed, group), seed_suggestions in zip(chunk, suggestions):
+                movie_ids = [
+                    tmdb_id for tmdb_id in self.title_index.resolve_recommendations(seed_suggestions)
+                    if tmdb_id not in seed
+                ][:RECOMMENDATIONS_PER_USER]
+                if not movie_ids:
+                    logger.info(f"Seed {self.seed_key(seed)} resolved to no movies; storing it empty.")
+                for user_id in group["user_ids"]:
+                    records.append(UserRecommendation(user_id=user_id, seed_key=self.seed_key(seed), movie_ids=movie_ids))
+
+            UserRecommendation.objects.bulk_create(
+                records, update_conflicts=True, unique_fields=['user'], update_fields=['seed_key', 'movie_ids', 'generated_at'],
+            )
+            stats["written"] += len(records)
+            logger.info(f"Batch {start // self.seeds_per_call + 1}: {len(chunk)} seeds, {len(records)} users updated.")
+        return stats
@@ -0,0 +1,165 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from movies.models import Genre, Movie, MovieGenre
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+# Same page size as TMDB, so local and upstream pages line up.
+PAGE_SIZE = 20
+BATCH_SIZE = 1000
+GENRE_NAMES_CACHE_KEY = "catalog:genre_names"
+GENRE_NAMES_CACHE_TIMEOUT = 60 * 60
+
+
+# Rows with list or detail data. Rows imported from TMDB's id export carry
+# neither a poster nor a release date and would render as blank cards.
+LISTABLE = Q(poster_path__isnull=False) | Q(release_date__isnull=False)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CatalogService:
+    """
+    Serves movie browsing queries from the local catalog instead of TMDB.
+
+    Queries are shaped so each filter combination is answered by one index:
+    unfiltered and genre-only browsing seek on precomputed popularity ranks,
+    and other combinations use the composite (genre, year, rating, popularity)
+    indexes. Pagination never counts rows; it fetches one extra row instead.
+
+    Every filter combination answers from the same snapshot: the movies ranked
+    by the last `rebuild()`. Movies recorded into the index since then appear
+    after the next rebuild.
+    """
+
+    def is_available(self) -> bool:
+        """Whether the local catalog has been built (see `build_catalog`)."""
+        return Movie.objects.filter(popularity_rank__isnull=False).exists()
+
+    def get_genres(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the locally stored genres in the shape of TMDB's /genre/movie/list,
+        or None if they have not been synced yet.
+        """
+        genres = list(Genre.objects.values('id', 'name'))
+        return {"genres": genres} if genres else None
+
+    def genre_names(self) -> Dict[int, str]:
+        """Maps genre ids to names. The list rarely changes, so it is cached."""
+        names = cache.get(GENRE_NAMES_CACHE_KEY)
+        if names is None:
+            names = dict(Genre.objects.values_list('id', 'name'))
+            cache.set(GENRE_NAMES_CACHE_KEY, names, GENRE_NAMES_CACHE_TIMEOUT)
+        return names
+
+    def discover_movies(self, genre: Optional[str] = None, year: Optional[int] = None, rating: Optional[float] = None, page: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        Local counterpart of `TMDBService.discover_movies`, returning the same shape.
+        Since rows are not counted, `total_pages` is only known to be at least
+        `page + 1` while more results exist, and `total_results` is None.
+
+        Returns:
+            Optional[Dict[str, Any]]: The page of results, or None if the catalog
+                                      has not been built.
+        """
+        if not self.is_available():
+            return None
+
+        genre_id, year, rating = _to_int(genre), _to_int(year), _to_float(rating)
+        page = max(_to_int(page) or 1, 1)
+        start = (page - 1) * PAGE_SIZE
+
+        if genre_id is not None:
+            queryset = MovieGenre.objects.filter(genre_id=genre_id).select_related('movie')
+        else:
+            # Genre links only exist for ranked movies; keep the other paths to the same set
+            queryset = Movie.objects.filter(popularity_rank__isnull=False)
+
+        if year is None and rating is None:
+            # Rank seek: an index range scan, with no OFFSET regardless of page depth
+            queryset = queryset.filter(
+                popularity_rank__gt=start, popularity_rank__lte=start + PAGE_SIZE + 1,
+            ).order_by('popularity_rank')
+        else:
+            if year is not None:
+                queryset = queryset.filter(release_year=year)
+            if rating is not None:
+                queryset = queryset.filter(vote_average__gte=rating)
+            queryset = queryset.order_by('-popularity')[start:start + PAGE_SIZE + 1]
+
+        rows = list(queryset)
+        has_next = len(rows) > PAGE_SIZE
+        movies = [row.movie if genre_id is not None else row for row in rows[:PAGE_SIZE]]
+        return {
+            "page": page,
+            "results": [movie.as_tmdb_result() for movie in movies],
+            "total_pages": page + 1 if has_next else page,
+            "total_results": None,
+        }
+
+    def sync_genres(self, genres: List[Dict[str, Any]]) -> int:
+        """Upserts genres from TMDB's /genre/movie/list payload."""
+        objs = [Genre(id=genre["id"], name=genre["name"]) for genre in genres]
+        Genre.objects.bulk_create(objs, update_conflicts=True, unique_fields=["id"], update_fields=["name"])
+        cache.delete(GENRE_NAMES_CACHE_KEY)
+        return len(objs)
+
+    @transaction.atomic
+    def rebuild(self) -> int:
+        """
+        Rebuilds the (movie, genre) filter table from `Movie.genre_ids` and
+        recomputes the catalog-wide and per-genre popularity rankings, for
+        movies with list or detail data only.
+
+        Returns:
+            int: The number of movies ranked.
+        """
+        MovieGenre.objects.all().delete()
+        Movie.objects.filter(popularity_rank__isnull=False).update(popularity_rank=None)
+        listable = Movie.objects.filter(LISTABLE)
+        links = []
+        for movie in listable.only('id', 'genre_ids', 'release_year', 'vote_average', 'popularity').iterator():
+            for genre_id in set(movie.genre_ids or []):
+                links.append(MovieGenre(
+                    movie_id=movie.id, genre_id=genre_id, release_year=movie.release_year,
+                    vote_average=movie.vote_average, popularity=movie.popularity,
+                ))
+                if len(links) >= BATCH_SIZE:
+                    MovieGenre.objects.bulk_create(links)
+                    links = []
+        MovieGenre.objects.bulk_create(links)
+
+        ranked = self._rank(listable, partition_by=None)
+        self._rank(MovieGenre.objects.all(), partition_by=[F('genre_id')])
+        return ranked
+
+    @staticmethod
+    def _rank(queryset, partition_by) -> int:
+        """Writes `popularity_rank` (1 = most popular) with a ROW_NUMBER window."""
+        ranks = queryset.annotate(
+            rank=Window(RowNumber(), partition_by=partition_by, order_by=[F('popularity').desc(), F('id').asc()])
+        ).values_list('id', 'rank')
+        model = queryset.model
+        updates = [model(id=pk, popularity_rank=rank) for pk, rank in ranks]
+        model.objects.bulk_update(updates, ['popularity_rank'], batch_size=BATCH_SIZE)
+        return len(updates)
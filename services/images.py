@@ -0,0 +1,203 @@
+import os
+import re
+import logging
+import tempfile
+import time
+import requests
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.urls import reverse
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; without it originals are served unresized
+    Image = None
+    features = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+TMDB_IMAGE_BASE_URL = os.getenv("TMDB_IMAGE_BASE_URL", "https://image.tmdb.org/t/p")
+# The TMDB size fetched once per image; every variant is resized from it.
+# w780 matches the largest width served, so cold variants never pull multi-MB originals.
+TMDB_IMAGE_SOURCE_SIZE = os.getenv("TMDB_IMAGE_SOURCE_SIZE", "w780")
+# Refuse to download anything larger than this from upstream.
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+
+# The only widths we render, so each image has a bounded number of variants.
+# The cache as a whole is bounded by `prune_image_cache` (IMAGE_CACHE_MAX_*).
+IMAGE_WIDTHS = (92, 154, 185, 342, 500, 780)
+IMAGE_FORMATS = {
+    "avif": {"content_type": "image/avif", "pil_format": "AVIF", "options": {"quality": 50}},
+    "webp": {"content_type": "image/webp", "pil_format": "WEBP", "options": {"quality": 80, "method": 4}},
+    "jpg": {"content_type": "image/jpeg", "pil_format": "JPEG", "options": {"quality": 82, "optimize": True, "progressive": True}},
+}
+
+# TMDB file names look like "/qJ2tW6WMUDux911r6m7haRef0WH.jpg"
+_TMDB_FILE_RE = re.compile(r"^/?(?P<name>[A-Za-z0-9_-]+)\.jpg$")
+
+
+def avif_supported() -> bool:
+    """Whether the installed Pillow can encode AVIF."""
+    if features is None:
+        return False
+    try:
+        return bool(features.check("avif"))
+    except (ValueError, KeyError):
+        return False
+
+
+def default_format() -> str:
+    """WebP when Pillow can re-encode images, otherwise the JPEG that TMDB serves."""
+    return "webp" if Image is not None else "jpg"
+
+
+def image_url(tmdb_path: Optional[str], width: int, fmt: Optional[str] = None) -> Optional[str]:
+    """
+    Builds the local proxy URL for a TMDB image path at the given width and format
+    (`default_format()` if not given).
+    Returns None when the path is empty or not a TMDB file name.
+    """
+    match = _TMDB_FILE_RE.match(tmdb_path or "")
+    if not match:
+        return None
+    fmt = fmt or default_format()
+    return reverse("movies:image", kwargs={"width": width, "name": match.group("name"), "fmt": fmt})
+
+
+def image_srcset(tmdb_path: Optional[str], widths: Iterable[int], fmt: Optional[str] = None) -> str:
+    """Builds a `srcset` attribute value, e.g. '/movies/images/w154/abc.webp 154w, ...'."""
+    entries = []
+    for width in widths:
+        url = image_url(tmdb_path, width, fmt)
+        if url:
+            entries.append(f"{url} {width}w")
+    return ", ".join(entries)
+
+
+class ImageProxyService:
+    """
+    Fetches TMDB images once and stores resized, re-encoded variants on disk.
+    Variants are keyed by (name, width, format) and never change, so they can be
+    served with immutable cache headers.
+    """
+
+    def __init__(self, cache_root: Optional[str] = None):
+        self.cache_root = Path(cache_root or settings.IMAGE_CACHE_ROOT)
+        self.source_dir = self.cache_root / "src"
+
+    def is_valid_request(self, width: int, fmt: str) -> bool:
+        if width not in IMAGE_WIDTHS or fmt not in IMAGE_FORMATS:
+            return False
+        if Image is None:
+            # Without Pillow we can only pass the original JPEG through
+            return fmt == "jpg"
+        return fmt != "avif" or avif_supported()
+
+    def get_variant(self, name: str, width: int, fmt: str) -> Optional[Path]:
+        """
+        Returns the path of the requested variant, rendering it on first use.
+
+        Args:
+            name (str): The TMDB file name without its extension.
+            width (int): One of IMAGE_WIDTHS.
+            fmt (str): One of IMAGE_FORMATS.
+
+        Returns:
+            Optional[Path]: The file on disk, or None if it could not be produced.
+        """
+        if not self.is_valid_request(width, fmt) or not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+            return None
+
+        variant = self.cache_root / f"w{width}" / f"{name}.{fmt}"
+        if variant.exists():
+            return variant
+
+        source = self._get_source(name)
+        if source is None:
+            return None
+        if Image is None:
+            return source
+
+        try:
+            with Image.open(source) as img:
+                if img.width > width:
+                    img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+                if fmt == "jpg" or img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGB")
+                self._write_atomic(variant, lambda fp: img.save(fp, IMAGE_FORMATS[fmt]["pil_format"], **IMAGE_FORMATS[fmt]["options"]))
+        except Exception as e:
+            logger.error(f"Failed to render image variant {variant}: {e}")
+            return None
+        return variant
+
+    def _get_source(self, name: str) -> Optional[Path]:
+        """Downloads the source image from TMDB unless it is already on disk."""
+        source = self.source_dir / f"{name}.jpg"
+        if source.exists():
+            return source
+
+        url = f"{TMDB_IMAGE_BASE_URL}/{TMDB_IMAGE_SOURCE_SIZE}/{name}.jpg"
+        try:
+            with requests.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                content = response.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+            if len(content) > MAX_SOURCE_BYTES:
+                logger.error(f"Image {url} exceeds {MAX_SOURCE_BYTES} bytes; not caching it.")
+                return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Image request failed for {url}: {e}")
+            return None
+
+        self._write_atomic(source, lambda fp: fp.write(content))
+        return source
+
+    def prune(self, max_bytes: int, max_age_days: int) -> Dict[str, int]:
+        """
+        Deletes cached files (sources and variants) last written more than
+        `max_age_days` ago, then the oldest remaining ones until the cache fits
+        in `max_bytes`. Deleted variants are simply re-rendered on next request.
+
+        Returns:
+            Dict[str, int]: Files and bytes removed, and bytes kept.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        files = []
+        for path in self.cache_root.rglob("*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # removed concurrently
+                continue
+            if path.is_file():
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        removed = removed_bytes = 0
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+            removed_bytes += size
+        return {"removed": removed, "removed_bytes": removed_bytes, "kept_bytes": total}
+
+    @staticmethod
+    def _write_atomic(path: Path, write) -> None:
+        """Writes via a temp file and rename, so concurrent readers never see partial files."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                write(fp)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
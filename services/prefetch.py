@@ -0,0 +1,92 @@
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+
+from core.admission import client_key
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Warms the TMDB cache in the background after a page has been rendered.
+
+    Jobs run on a small shared thread pool. Work is dropped rather than queued
+    once the global or per-user number of pending jobs reaches its budget, so
+    prefetching can never build up a backlog or delay foreground requests.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None, per_user_pending: Optional[int] = None):
+        self.max_pending = max_pending or settings.PREFETCH_MAX_PENDING
+        self.per_user_pending = per_user_pending or settings.PREFETCH_PER_USER_PENDING
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.PREFETCH_MAX_WORKERS,
+            thread_name_prefix="prefetch",
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_by_user: Dict[str, int] = defaultdict(int)
+
+    def submit(self, user_key: str, fn: Callable[..., Any], *args, **kwargs) -> bool:
+        """
+        Schedules `fn(*args, **kwargs)` if both budgets allow it.
+
+        Returns:
+            bool: True if the job was scheduled, False if it was dropped.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending or self._pending_by_user[user_key] >= self.per_user_pending:
+                return False
+            self._pending += 1
+            self._pending_by_user[user_key] += 1
+
+        try:
+            self._executor.submit(self._run, user_key, fn, args, kwargs)
+        except RuntimeError:  # executor shut down (interpreter exit)
+            self._release(user_key)
+            return False
+        return True
+
+    def _run(self, user_key: str, fn: Callable[..., Any], args, kwargs) -> None:
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Prefetch job {getattr(fn, '__name__', fn)} failed: {e}")
+        finally:
+            self._release(user_key)
+
+    def _release(self, user_key: str) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._pending_by_user[user_key] -= 1
+            if self._pending_by_user[user_key] <= 0:
+                del self._pending_by_user[user_key]
+
+    def prefetch_listing(self, request, tmdb_service, movies: Iterable[Dict[str, Any]], next_page: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Warms what the user is most likely to open after viewing a listing page:
+        the next page first, then the details of the visible movies in display order.
+
+        Args:
+            request: The current request, used to pick the per-user budget.
+            tmdb_service: The TMDBService whose cache should be warmed.
+            movies (Iterable[Dict[str, Any]]): The movies shown on the page.
+            next_page (Optional[Callable[[], Any]]): Fetches page N+1, if there is one.
+        """
+        if not settings.PREFETCH_ENABLED:
+            return
+        user_key = client_key(request)
+        if next_page is not None:
+            self.submit(user_key, next_page)
+        for movie in list(movies)[:settings.PREFETCH_DETAILS_LIMIT]:
+            if movie.get('id') and not self.submit(user_key, tmdb_service.get_movie_details, movie['id']):
+                break
+
+
+# A single pool per process, shared by all views.
+prefetcher = Prefetcher()
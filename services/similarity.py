@@ -0,0 +1,242 @@
+import os
+import re
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+# Relative weight of each feature family in the movie vectors.
+FEATURE_WEIGHTS = {
+    "g": 1.0,   # genre
+    "k": 1.0,   # keyword
+    "c": 0.6,   # top-billed cast
+    "d": 1.2,   # director
+    "w": 0.8,   # writer
+    "o": 0.4,   # overview term
+}
+TOP_CAST = 5
+# More recent watchlist entries count more towards the user's taste profile.
+RECENCY_DECAY = 0.1
+# Rows scored per block when precomputing neighbor tables (bounds peak memory).
+NEIGHBOR_BLOCK_SIZE = 512
+
+_WORD_RE = re.compile(r"[a-z]{3,}")
+_STOPWORDS = frozenset(
+    "the and for with that this from his her their they them who what when where which while into "
+    "after before about over under one two new old are was were has have had but not all its out "
+    "him she will can only must find finds life world story young man woman when becomes".split()
+)
+
+
+def extract_features(details: Dict[str, Any]) -> List[str]:
+    """
+    Turns a TMDB movie details payload (with `keywords` and `credits` appended)
+    into prefixed feature tokens, e.g. ["g:878", "k:310", "d:137427", "o:replicant"].
+    """
+    tokens = [f"g:{genre['id']}" for genre in details.get("genres", [])]
+    tokens += [f"g:{genre_id}" for genre_id in details.get("genre_ids", [])]
+    tokens += [f"k:{kw['id']}" for kw in details.get("keywords", {}).get("keywords", [])]
+
+    credits = details.get("credits", {})
+    tokens += [f"c:{person['id']}" for person in credits.get("cast", [])[:TOP_CAST]]
+    for person in credits.get("crew", []):
+        if person.get("job") == "Director":
+            tokens.append(f"d:{person['id']}")
+        elif person.get("department") == "Writing":
+            tokens.append(f"w:{person['id']}")
+
+    words = _WORD_RE.findall((details.get("overview") or "").lower())
+    tokens += [f"o:{word}" for word in words if word not in _STOPWORDS]
+    return tokens
+
+
+class SimilarityModel:
+    """
+    A content-based similarity model over the local movie catalog.
+
+    Holds an L2-normalized TF-IDF matrix (one row per movie) plus precomputed
+    top-k neighbor tables, so similar-movie lookups are a table read and
+    watchlist scoring is a single sparse matrix-vector product.
+    """
+
+    def __init__(self, ids: np.ndarray, matrix: sparse.csr_matrix, neighbors: np.ndarray, scores: np.ndarray):
+        self.ids = ids
+        self.matrix = matrix
+        self.neighbors = neighbors
+        self.scores = scores
+        self.row_of = {int(tmdb_id): row for row, tmdb_id in enumerate(ids)}
+
+    @classmethod
+    def build(cls, features: Dict[int, List[str]], k: int = 20) -> "SimilarityModel":
+        """
+        Builds the model from a mapping of tmdb_id -> feature tokens.
+        """
+        ids = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        vocabulary: Dict[str, int] = {}
+        rows, cols, values = [], [], []
+        for row, tokens in enumerate(features.values()):
+            for token, count in Counter(tokens).items():
+                col = vocabulary.setdefault(token, len(vocabulary))
+                rows.append(row)
+                cols.append(col)
+                values.append(count)
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float32), (rows, cols)),
+            shape=(len(ids), len(vocabulary)),
+        )
+
+        # TF-IDF, scaled by the weight of each token's feature family
+        document_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + len(ids)) / (1 + document_freq)) + 1
+        family_weight = np.empty(len(vocabulary), dtype=np.float32)
+        for token, col in vocabulary.items():
+            family_weight[col] = FEATURE_WEIGHTS.get(token[0], 1.0)
+        matrix.data = np.log1p(matrix.data)
+        matrix = matrix @ sparse.diags((idf * family_weight).astype(np.float32))
+        matrix = _l2_normalize(sparse.csr_matrix(matrix, dtype=np.float32))
+
+        neighbors, scores = _top_k_neighbors(matrix, k)
+        return cls(ids, matrix, neighbors, scores)
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarityModel":
+        with np.load(path) as data:
+            matrix = sparse.csr_matrix(
+                (data["data"], data["indices"], data["indptr"]), shape=tuple(data["shape"])
+            )
+            return cls(data["ids"], matrix, data["neighbors"], data["scores"])
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            ids=self.ids, neighbors=self.neighbors, scores=self.scores,
+            data=self.matrix.data, indices=self.matrix.indices,
+            indptr=self.matrix.indptr, shape=np.asarray(self.matrix.shape),
+        )
+        os.replace(tmp_path, path)
+
+    def similar_to(self, tmdb_id: int, k: int = 10) -> List[int]:
+        """Returns the precomputed nearest neighbors of a single movie."""
+        row = self.row_of.get(int(tmdb_id))
+        if row is None:
+            return []
+        return [int(self.ids[col]) for col in self.neighbors[row, :k] if col >= 0]
+
+    def recommend(self, tmdb_ids: Iterable[int], k: int = 5, exclude: Iterable[int] = ()) -> List[int]:
+        """
+        Scores the whole catalog against a list of seed movies at once.
+
+        Args:
+            tmdb_ids (Iterable[int]): Seed movies, most recent first.
+            k (int): The number of recommendations to return.
+            exclude (Iterable[int]): Extra tmdb_ids that must not be recommended.
+
+        Returns:
+            List[int]: Up to k tmdb_ids, best match first.
+        """
+        seed_rows = [self.row_of[int(i)] for i in tmdb_ids if int(i) in self.row_of]
+        if not seed_rows:
+            return []
+
+        weights = 1.0 / (1.0 + RECENCY_DECAY * np.arange(len(seed_rows), dtype=np.float32))
+        profile = sparse.csr_matrix(weights) @ self.matrix[seed_rows]
+        scores = (self.matrix @ profile.T).toarray().ravel()
+
+        blocked = seed_rows + [self.row_of[int(i)] for i in exclude if int(i) in self.row_of]
+        scores[blocked] = -np.inf
+
+        k = min(k, len(scores) - len(set(blocked)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [int(self.ids[row]) for row in top if scores[row] > 0]
+
+
+def _l2_normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms).astype(np.float32) @ matrix)
+
+
+def _top_k_neighbors(matrix: sparse.csr_matrix, k: int):
+    """
+    Computes the k most similar rows for every row, one block of rows at a time.
+    Missing neighbors (tiny catalogs) are padded with -1 / 0.0.
+    """
+    n = matrix.shape[0]
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    kk = min(k, n - 1)
+    if kk <= 0:
+        return neighbors, scores
+
+    for start in range(0, n, NEIGHBOR_BLOCK_SIZE):
+        stop = min(start + NEIGHBOR_BLOCK_SIZE, n)
+        block = (matrix[start:stop] @ matrix.T).toarray()
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # never your own neighbor
+        top = np.argpartition(-block, kk - 1, axis=1)[:, :kk]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        neighbors[start:stop, :kk] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop, :kk] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbors, scores
+
+
+class SimilarityService:
+    """
+    Serves recommendations from the model file written by `build_similarity_model`.
+    The model is loaded lazily and reloaded when the file on disk changes.
+    """
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or settings.SIMILARITY_MODEL_PATH
+        self._model: Optional[SimilarityModel] = None
+        self._mtime: Optional[float] = None
+        self._warned_missing = False
+        self._lock = threading.Lock()
+
+    def get_model(self) -> Optional[SimilarityModel]:
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            if not self._warned_missing:
+                logger.warning(f"Similarity model not found at {self.model_path}; run build_similarity_model.")
+                self._warned_missing = True
+            return None
+
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        self._model = SimilarityModel.load(self.model_path)
+                        self._mtime = mtime
+                        self._warned_missing = False
+                    except Exception as e:
+                        logger.error(f"Failed to load similarity model from {self.model_path}: {e}")
+                        return None
+        return self._model
+
+    def recommend_for_watchlist(self, tmdb_ids: List[int], k: int = 5) -> List[int]:
+        """
+        Recommends k movies for a watchlist (most recent first), excluding the watchlist itself.
+        """
+        model = self.get_model()
+        if model is None or not tmdb_ids:
+            return []
+        return model.recommend(tmdb_ids, k=k)
+
+    def similar_movies(self, tmdb_id: int, k: int = 10) -> List[int]:
+        model = self.get_model()
+        return model.similar_to(tmdb_id, k) if model else []
@@ -0,0 +1,268 @@
+import re
+import contextvars
+import logging
+import unicodedata
+from datetime import date
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional
+
+from django.db import connection
+from django.db.models import Q
+
+from movies.models import Movie
+from services.tmdb import TMDBService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+# Minimum similarity ratio for two normalized titles to be considered the same film.
+FUZZY_MATCH_THRESHOLD = 0.85
+# Release years reported by the AI are often off by one (festival vs. wide release).
+YEAR_TOLERANCE = 1
+# Upper bound on concurrent TMDB searches issued for index misses.
+MAX_SEARCH_WORKERS = 5
+# Most popular rows loaded per first-word prefix for fuzzy matching.
+PREFIX_CANDIDATE_LIMIT = 200
+
+_LEADING_ARTICLE_RE = re.compile(r"^(the|a|an)\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """
+    Builds the lookup key for a movie title: lowercased, accents stripped,
+    '&' spelled out, punctuation removed and a leading article dropped.
+    e.g. "The Lord of the Rings: The Two Towers" -> "lord of the rings the two towers"
+    """
+    if not title:
+        return ""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = text.replace("&", " and ")
+    text = _NON_ALNUM_RE.sub(" ", text).strip()
+    return _LEADING_ARTICLE_RE.sub("", text)
+
+
+def _parse_year(value: Any) -> Optional[int]:
+    """Returns the year as an int, accepting ints, '2017' or '2017-10-04'."""
+    if value is None:
+        return None
+    match = re.match(r"\d{4}", str(value))
+    return int(match.group(0)) if match else None
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+class TitleIndex:
+    """
+    A local title+year -> tmdb_id index backed by the `Movie` table.
+    It validates the `tmdb_id`s suggested by the AI in bulk, so detail
+    fetches are only issued for ids that are known to be correct.
+    """
+
+    def __init__(self, tmdb_service: TMDBService):
+        self.tmdb_service = tmdb_service
+
+    def record(self, results: Iterable[Dict[str, Any]], overwrite: bool = True) -> int:
+        """
+        Upserts TMDB movie list results (search, discover, trending, ...) into the index.
+
+        Args:
+            results (Iterable[Dict[str, Any]]): TMDB movie objects.
+            overwrite (bool): Whether existing rows are updated. Pass False for sparse
+                              sources (e.g. the daily id export) so they never clobber
+                              richer records.
+
+        Returns:
+            int: The number of records written.
+        """
+        movies = {}
+        for result in results:
+            title = result.get("title") or result.get("original_title")
+            if not result.get("id") or not title:
+                continue
+            release_date = _parse_date(result.get("release_date"))
+            movies[result["id"]] = Movie(
+                tmdb_id=result["id"],
+                title=title[:255],
+                original_title=(result.get("original_title") or "")[:255],
+                normalized_title=normalize_title(title)[:255],
+                release_date=release_date,
+                release_year=release_date.year if release_date else None,
+                poster_path=result.get("poster_path"),
+                overview=result.get("overview") or "",
+                vote_average=result.get("vote_average") or 0,
+                vote_count=result.get("vote_count") or 0,
+                popularity=result.get("popularity") or 0,
+                # List results carry genre_ids, detail payloads carry genres
+                genre_ids=result.get("genre_ids") or [genre["id"] for genre in result.get("genres", [])],
+            )
+        if not movies:
+            return 0
+
+        if not overwrite:
+            Movie.objects.bulk_create(movies.values(), ignore_conflicts=True)
+            return len(movies)
+
+        Movie.objects.bulk_create(
+            movies.values(),
+            update_conflicts=True,
+            unique_fields=["tmdb_id"],
+            update_fields=[
+                "title", "original_title", "normalized_title", "release_date", "release_year",
+                "poster_path", "overview", "vote_average", "vote_count", "popularity", "genre_ids",
+            ],
+        )
+        return len(movies)
+
+    def resolve_recommendations(self, suggestions: List[Dict[str, Any]]) -> List[int]:
+        """
+        Resolves AI suggestions of the form {"title", "year", "tmdb_id"} to verified TMDB ids.
+
+        All suggestions are checked against the index with a single query. Only the
+        ones that cannot be matched locally fall back to a TMDB search, and those
+        searches are issued together as one concurrent batch.
+
+        Returns:
+            List[int]: Verified tmdb_ids, in suggestion order and without duplicates.
+        """
+        wanted = []
+        for suggestion in suggestions:
+            if not isinstance(suggestion, dict):
+                continue
+            key = normalize_title(suggestion.get("title"))
+            tmdb_id = suggestion.get("tmdb_id")
+            if not key and not tmdb_id:
+                continue
+            wanted.append({
+                "title": suggestion.get("title"),
+                "key": key,
+                "year": _parse_year(suggestion.get("year")),
+                "tmdb_id": tmdb_id if isinstance(tmdb_id, int) else None,
+            })
+        if not wanted:
+            return []
+
+        candidates = self._fetch_candidates(wanted)
+        resolved: List[Optional[int]] = [self._match(item, candidates) for item in wanted]
+
+        misses = [i for i, tmdb_id in enumerate(resolved) if tmdb_id is None and wanted[i]["key"]]
+        if misses:
+            for i, tmdb_id in zip(misses, self._search_misses([wanted[i] for i in misses])):
+                resolved[i] = tmdb_id
+
+        seen = set()
+        ordered = []
+        for tmdb_id in resolved:
+            if tmdb_id is not None and tmdb_id not in seen:
+                seen.add(tmdb_id)
+                ordered.append(tmdb_id)
+        return ordered
+
+    def _fetch_candidates(self, wanted: List[Dict[str, Any]]) -> List[Movie]:
+        """
+        Loads every index row that could match any suggestion: the suggested ids,
+        exact title keys, and the most popular rows sharing a key's first word
+        (the fuzzy match pool, capped at PREFIX_CANDIDATE_LIMIT per prefix).
+        Where the database allows it, everything is fetched in one UNION query.
+        """
+        fields = ("tmdb_id", "normalized_title", "release_year", "popularity")
+        query = Q(tmdb_id__in=[item["tmdb_id"] for item in wanted if item["tmdb_id"]])
+        keys = {item["key"] for item in wanted if item["key"]}
+        if keys:
+            query |= Q(normalized_title__in=keys)
+        exact = Movie.objects.filter(query).only(*fields)
+
+        prefixed = [
+            Movie.objects.filter(normalized_title__startswith=prefix).order_by('-popularity').only(*fields)[:PREFIX_CANDIDATE_LIMIT]
+            # Very short first words ("i", "up") would pull in half the catalog
+            for prefix in {key.split(" ", 1)[0] for key in keys} if len(prefix) >= 3
+        ]
+        if prefixed and connection.features.supports_slicing_ordering_in_compound:
+            return list(exact.order_by().union(*prefixed))
+
+        candidates = {movie.pk: movie for movie in exact}
+        for queryset in prefixed:
+            for movie in queryset:
+                candidates.setdefault(movie.pk, movie)
+        return list(candidates.values())
+
+    @staticmethod
+    def _year_matches(expected: Optional[int], actual: Optional[int]) -> bool:
+        if expected is None or actual is None:
+            return True
+        return abs(expected - actual) <= YEAR_TOLERANCE
+
+    @staticmethod
+    def _title_matches(expected: str, actual: str) -> bool:
+        if not expected:
+            return True
+        return expected == actual or SequenceMatcher(None, expected, actual).ratio() >= FUZZY_MATCH_THRESHOLD
+
+    def _match(self, item: Dict[str, Any], candidates: List[Movie]) -> Optional[int]:
+        """Matches one suggestion against the preloaded candidate rows."""
+        # 1. The suggested id is trusted only if it points at the same title and year.
+        for movie in candidates:
+            if movie.tmdb_id == item["tmdb_id"]:
+                if self._title_matches(item["key"], movie.normalized_title) and \
+                        self._year_matches(item["year"], movie.release_year):
+                    return movie.tmdb_id
+                break
+
+        if not item["key"]:
+            return None
+
+        # 2. Exact title key, then the closest fuzzy title; most popular wins ties.
+        pool = [m for m in candidates if self._year_matches(item["year"], m.release_year)]
+        exact = [m for m in pool if m.normalized_title == item["key"]]
+        if exact:
+            return max(exact, key=lambda m: m.popularity).tmdb_id
+
+        best, best_ratio = None, FUZZY_MATCH_THRESHOLD
+        for movie in pool:
+            ratio = SequenceMatcher(None, item["key"], movie.normalized_title).ratio()
+            if ratio > best_ratio or (ratio == best_ratio and best and movie.popularity > best.popularity):
+                best, best_ratio = movie, ratio
+        return best.tmdb_id if best else None
+
+    def _search_misses(self, misses: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Searches TMDB for suggestions the index could not resolve, records every
+        result into the index and returns the best match for each miss.
+        """
+        def search(item):
+            # TMDB filters on an exact year; search by title and let _match apply YEAR_TOLERANCE
+            data = self.tmdb_service.search_movies(item["title"])
+            return data.get("results", []) if data else []
+
+        with ThreadPoolExecutor(max_workers=min(len(misses), MAX_SEARCH_WORKERS)) as executor:
+            # Each search runs in a copy of the caller's context, so the request deadline applies
+            futures = [executor.submit(contextvars.copy_context().run, search, item) for item in misses]
+            result_sets = [future.result() for future in futures]
+
+        try:
+            self.record(result for results in result_sets for result in results)
+        except Exception as e:
+            # The index is only an optimization; a failed write must not break resolution.
+            logger.error(f"Failed to record search results into the title index: {e}")
+
+        resolved = []
+        for item, results in zip(misses, result_sets):
+            candidates = [
+                Movie(
+                    tmdb_id=r["id"],
+                    normalized_title=normalize_title(r.get("title")),
+                    release_year=_parse_year(r.get("release_date")),
+                    popularity=r.get("popularity") or 0,
+                )
+                for r in results if r.get("id")
+            ]
+            resolved.append(self._match({**item, "tmdb_id": None}, candidates))
+        return resolved
@@ -1,7 +1,11 @@
 import os
+import hashlib
+import time
 import requests
 import logging
+from urllib.parse import urlencode
 from dotenv import load_dotenv
+from core import cache_codec, deadline
 from typing import Dict, Any, Optional
 
 # --- Setup ---
@@ -16,6 +20,15 @@ logger = logging.getLogger(__name__)
 # --- Constants ---
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_BASE_URL = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
+TMDB_REQUEST_TIMEOUT = 10
+# How long (in seconds) TMDB responses are cached. Lists change often, details rarely.
+TMDB_CACHE_TIMEOUT = int(os.getenv("TMDB_CACHE_TIMEOUT", 60 * 10))
+TMDB_DETAILS_CACHE_TIMEOUT = int(os.getenv("TMDB_DETAILS_CACHE_TIMEOUT", 60 * 60 * 24))
+# How long an expired entry is kept so it can be revalidated with a conditional
+# GET (ETag / Last-Modified) instead of being downloaded again.
+TMDB_REVALIDATE_RETENTION = int(os.getenv("TMDB_REVALIDATE_RETENTION", 60 * 60 * 24 * 7))
+# Bump when the layout of cached entries changes, so old entries are never read back.
+TMDB_CACHE_SCHEMA = 2
 
 # --- Service Class ---
 class TMDBService:
@@ -34,41 +47,109 @@ class TMDBService:
         self.api_key = TMDB_API_KEY
         self.base_url = TMDB_BASE_URL
 
-    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def cache_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Builds the cache key for a request. Parameter values are compared as
+        strings, so page=2 (int) and page='2' (from a query string) share an entry.
+        """
+        query = urlencode(sorted((k, str(v)) for k, v in (params or {}).items()))
+        digest = hashlib.md5(f"{endpoint}?{query}".encode()).hexdigest()
+        return cache_codec.versioned_key("tmdb", TMDB_CACHE_SCHEMA, digest)
+
+    def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None, cache_timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
         A private helper method to make requests to the TMDB API.
+        Successful responses are cached (compactly, see core/cache_codec.py);
+        errors are not.
+
+        Cache entries keep the response's ETag/Last-Modified validators and
+        outlive their freshness by TMDB_REVALIDATE_RETENTION. Once an entry
+        expires it is revalidated with a conditional GET; a 304 reply extends
+        it without downloading or decoding the body again. If TMDB cannot be
+        reached in time, times out or returns a 5xx, the expired entry is served
+        instead of nothing; a 404 drops it.
 
         Args:
             endpoint (str): The API endpoint to call (e.g., 'movie/popular').
             params (Optional[Dict[str, Any]]): Additional query parameters.
+            cache_timeout (Optional[int]): Seconds to cache the response for.
+                                           Defaults to TMDB_CACHE_TIMEOUT.
 
         Returns:
             Optional[Dict[str, Any]]: The JSON response as a Python dictionary, 
                                       or None if an error occurs.
         """
+        key = self.cache_key(endpoint, params)
+        if cache_timeout is None:
+            cache_timeout = TMDB_CACHE_TIMEOUT
+        entry = cache_codec.get(key)
+        if entry is not None and entry["fresh_until"] > time.time():
+            return entry["data"]
+        stale = entry["data"] if entry is not None else None
+
         url = f"{self.base_url}/{endpoint}"
+
+        # Stay within the current request's time budget, if any
+        timeout = deadline.timeout_for(TMDB_REQUEST_TIMEOUT)
+        if timeout is None:
+            logger.warning(f"Skipping request to {url}: request deadline exceeded.")
+            return stale
         
         # Prepare parameters, ensuring the API key is always included
         request_params = {"api_key": self.api_key}
         if params:
             request_params.update(params)
 
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
         try:
-            response = requests.get(url, params=request_params, timeout=10)
+            response = requests.get(url, params=request_params, headers=headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                # Unchanged upstream: keep the stored body, refresh its lifetime
+                self._store(key, entry["data"], response, cache_timeout, fallback=entry)
+                return entry["data"]
             # Raises an HTTPError for bad responses (4xx or 5xx)
             response.raise_for_status()  
-            return response.json()
+            data = response.json()
+            self._store(key, data, response, cache_timeout)
+            return data
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP Error for {url}: {e.response.status_code} - {e.response.text}")
+            status = e.response.status_code
+            logger.error(f"HTTP Error for {url}: {status} - {e.response.text}")
+            if status >= 500:
+                # Upstream outage: the last good body is better than nothing
+                return stale
+            if status == 404:
+                cache_codec.delete(key)
+            # Other 4xx (e.g. a revoked API key) must not be masked by old data
+            return None
         except requests.exceptions.RequestException as e:
             # For connection errors, timeouts, etc.
             logger.error(f"Request failed for {url}: {e}")
+            return stale
         except Exception as e:
             # For other unexpected errors, e.g., JSON decoding errors
             logger.error(f"An unexpected error occurred when requesting {url}: {e}")
             
         return None
 
+    @staticmethod
+    def _store(key: str, data: Dict[str, Any], response: requests.Response, cache_timeout: int, fallback: Optional[Dict[str, Any]] = None) -> None:
+        """Caches a response body with its validators, falling back to the previous ones if a 304 omits them."""
+        fallback = fallback or {}
+        cache_codec.set(key, {
+            "data": data,
+            "etag": response.headers.get("ETag") or fallback.get("etag"),
+            "last_modified": response.headers.get("Last-Modified") or fallback.get("last_modified"),
+            "fresh_until": time.time() + cache_timeout,
+        }, cache_timeout + TMDB_REVALIDATE_RETENTION)
+
     def search_movies(self, query: str, page: int = 1) -> Optional[Dict[str, Any]]:
         """
         Searches for movies on TMDB based on a query string.
@@ -121,7 +202,7 @@ class TMDBService:
         Corresponds to: GET /movie/{movie_id}
         """
         params = {"append_to_response": append_to_response}
-        return self._make_request(f"movie/{movie_id}", params)
+        return self._make_request(f"movie/{movie_id}", params, cache_timeout=TMDB_DETAILS_CACHE_TIMEOUT)
 
     def discover_movies(self, genre: Optional[str] = None, year: Optional[int] = None, rating: Optional[float] = None, page: int = 1) -> Optional[Dict[str, Any]]:
         """
@@ -143,7 +224,7 @@ class TMDBService:
         Gets the official list of movie genres from TMDB.
         Corresponds to: GET /genre/movie/list
         """
-        return self._make_request("genre/movie/list")
+        return self._make_request("genre/movie/list", cache_timeout=TMDB_DETAILS_CACHE_TIMEOUT)
 
 # --- Example Usage (for testing) ---
 # if __name__ == '__main__':
@@ -0,0 +1,96 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Any, Iterable, List
+
+from django.utils import timezone
+
+from movies.models import Movie, Watchlist
+from services.catalog import CatalogService
+from services.title_index import TitleIndex
+from services.tmdb import TMDBService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+# Catalog rows older than this are refetched by the refresher.
+STALE_AFTER = timedelta(days=7)
+BATCH_SIZE = 500
+FETCH_WORKERS = 8
+
+
+def enrich_watchlist(items: Iterable[Watchlist]) -> List[Dict[str, Any]]:
+    """
+    Joins watchlist rows against the local movie catalog in one query and
+    returns card-ready dicts with rating, runtime and genre names. Rows with
+    no catalog entry yet fall back to their denormalized snapshot.
+    """
+    items = list(items)
+    movies = Movie.objects.in_bulk([item.movie_id for item in items], field_name='tmdb_id')
+    genre_names = CatalogService().genre_names()
+
+    enriched = []
+    for item in items:
+        movie = movies.get(item.movie_id)
+        if movie is not None:
+            data = movie.as_tmdb_result()
+            data['genres'] = [genre_names[genre_id] for genre_id in movie.genre_ids if genre_id in genre_names]
+        else:
+            data = {
+                'id': item.movie_id,
+                'title': item.title,
+                'poster_path': item.poster_path,
+                'release_date': date(item.release_year, 1, 1) if item.release_year else None,
+                'vote_average': None,
+                'runtime': None,
+                'genres': [],
+            }
+        data['added_at'] = item.added_at
+        enriched.append(data)
+    return enriched
+
+
+def refresh_watchlist_metadata(tmdb_service: TMDBService, stale_after: timedelta = STALE_AFTER, limit: int = 1000) -> Dict[str, int]:
+    """
+    Refreshes catalog metadata for watchlisted movies that are missing or stale,
+    then rewrites the denormalized title/poster/year columns on every watchlist
+    row in bulk.
+
+    Returns:
+        Dict[str, int]: How many movies were fetched and watchlist rows updated.
+    """
+    watched_ids = set(Watchlist.objects.values_list('movie_id', flat=True).distinct())
+    fresh_ids = set(
+        Movie.objects.filter(
+            tmdb_id__in=watched_ids, runtime__isnull=False, updated_at__gte=timezone.now() - stale_after,
+        ).values_list('tmdb_id', flat=True)
+    )
+    to_fetch = sorted(watched_ids - fresh_ids)[:limit]
+
+    # Same append_to_response as the detail page, so recently viewed movies are cache hits
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        details = [d for d in executor.map(tmdb_service.get_movie_details, to_fetch) if d]
+    TitleIndex(tmdb_service).record(details)
+    # record() only upserts list fields; runtime and the refresh time are written here
+    runtimes, now = {d['id']: d.get('runtime') for d in details}, timezone.now()
+    Movie.objects.bulk_update(
+        [
+            Movie(id=pk, runtime=runtimes[tmdb_id], updated_at=now)
+            for pk, tmdb_id in Movie.objects.filter(tmdb_id__in=runtimes).values_list('id', 'tmdb_id')
+        ],
+        ['runtime', 'updated_at'], batch_size=BATCH_SIZE,
+    )
+
+    movies = Movie.objects.in_bulk(list(watched_ids), field_name='tmdb_id')
+    changed = []
+    for item in Watchlist.objects.filter(movie_id__in=movies.keys()).only('id', 'movie_id', 'title', 'poster_path', 'release_year'):
+        movie = movies[item.movie_id]
+        snapshot = (movie.title[:200], movie.poster_path, movie.release_year)
+        if (item.title, item.poster_path, item.release_year) != snapshot:
+            item.title, item.poster_path, item.release_year = snapshot
+            changed.append(item)
+    Watchlist.objects.bulk_update(changed, ['title', 'poster_path', 'release_year'], batch_size=BATCH_SIZE)
+
+    logger.info(f"Refreshed {len(details)} watchlisted movies and {len(changed)} watchlist rows.")
+    return {'fetched': len(details), 'updated': len(changed)}